@@ -0,0 +1,56 @@
+"""Memory used by each parsed instance, for plain dataclasses and for the compact options of `dataparser()`.
+
+The parsed instances are kept alive and the memory allocated for them is measured with `tracemalloc`, so the sizes
+include the `__dict__` of plain instances and the lists (or tuples) of values.
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dataparsers import arg, dataparser, parse_many
+
+INSTANCES = 20_000
+
+
+def job_class(**options):
+    @dataparser(prog="job", **options)
+    class Job:
+        name: str
+        priority: int = arg("-p", default=0)
+        retries: int = arg("-r", default=3)
+        queue: str = arg("-q", default="default")
+        tags: list[str] = arg("-t", nargs="+", default=None)
+
+    return Job
+
+
+OPTIONS = {
+    "dataclass": {},
+    "frozen": dict(frozen=True),
+    "slots": dict(slots=True),
+    "frozen, slots and tuples": dict(frozen=True, slots=True, tuples=True),
+}
+
+
+def main() -> None:
+    argvs = [["-p", "1", "-q", "gpu", f"job{i % 100}", "-t", "a", "b"] for i in range(INSTANCES)]
+    print(f"Python {sys.version.split()[0]}, {INSTANCES} instances")
+    baseline = None
+    for label, options in OPTIONS.items():
+        cls = job_class(**options)
+        parse_many(cls, argvs[:10])  # warm up the parser cache
+        tracemalloc.start()
+        instances = parse_many(cls, argvs, backend="table")
+        size = tracemalloc.get_traced_memory()[0] / INSTANCES
+        tracemalloc.stop()
+        assert all(isinstance(instance, cls) for instance in instances)
+        baseline = baseline or size
+        print(f"{label:>26}: {size:7.1f} bytes per instance ({size / baseline:.0%})")
+        del instances
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Throughput of `parse()` with one shared cached parser, called concurrently from many threads.
+
+Run with a free-threaded build of Python (e.g. `python3.13t benchmarks/threaded_parse.py`) to see the throughput scaling
+with the number of threads. With the GIL enabled, the throughput stays about the same for any number of threads.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dataparsers import arg, dataparser, parse, parse_known, subparser, subparsers
+
+
+@dataparser(prog="bot")
+class Command:
+    user: str = arg("-u", default="anonymous")
+    verbose: bool = arg("-v", default=False)
+    action: str | None = subparsers()
+    deploy: ClassVar = subparser()
+    service: str = arg("-s", default="web", subparser=deploy)
+    replicas: int = arg("-r", default=1, subparser=deploy)
+    status: ClassVar = subparser()
+    all: bool = arg("-a", default=False, subparser=status)
+
+
+ARGVS = [
+    ["-u", "alice", "deploy", "-s", "api", "-r", "3"],
+    ["-v", "status", "-a"],
+    ["--user=bob"],
+    ["deploy"],
+]
+CALLS_PER_THREAD = 20_000
+
+
+def work(_: int) -> None:
+    for i in range(CALLS_PER_THREAD):
+        argv = ARGVS[i % len(ARGVS)]
+        parse(Command, argv)
+        parse_known(Command, argv + ["--dry-run"], metavar="OPTIONS")
+
+
+def main() -> None:
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    work(0)  # warm up the parser cache
+    baseline = None
+    for threads in [1, 2, 4, 8]:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(work, range(threads)))
+        elapsed = time.perf_counter() - start
+        throughput = 2 * threads * CALLS_PER_THREAD / elapsed
+        baseline = baseline or throughput
+        print(f"{threads} threads: {throughput:10.0f} calls/s ({throughput / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -787,8 +787,10 @@ the `subparsers()` function will work::
 """
 
 from argparse import Action, ArgumentParser, FileType, HelpFormatter
+from concurrent.futures import Executor
+from os import PathLike
 from dataclasses import Field, dataclass
-from typing import Any, Callable, Iterable, Literal, Protocol, Sequence, TypeVar, overload
+from typing import IO, Any, Callable, Iterable, Iterator, Literal, NamedTuple, Protocol, Sequence, TypeVar, overload
 
 T = TypeVar("T", covariant=True)
 
@@ -805,6 +807,9 @@ def arg(
     group_title: str | int | None = None,
     mutually_exclusive_group_id: str | int | None = None,
     make_flag: bool | None = None,
+    concurrent: Literal["thread", "process"] | Executor | None = None,
+    container: Literal["array", "numpy"] | None = None,
+    env: str | None = None,
     action: (
         Literal[
             "store",
@@ -832,9 +837,10 @@ def arg(
     """Helper function to create `dataclass` fields storing specification about arguments, used later in the method
     `add_argument()`.
 
-    This function accepts all parameters of the original `add_argument()` method (except for `dest`). Three additional
-    parameters may be supplied, namely `group_title`, `mutually_exclusive_group_id` and `make_flag`. The parameter
-    `name_or_flags`, taken from the original `add_argument()` method, behaves a little different.
+    This function accepts all parameters of the original `add_argument()` method (except for `dest`). Six additional
+    parameters may be supplied, namely `group_title`, `mutually_exclusive_group_id`, `make_flag`, `concurrent`,
+    `container` and `env`. The parameter `name_or_flags`, taken from the original `add_argument()` method, behaves a little
+    different.
 
     Parameters
     ----------
@@ -1061,6 +1067,46 @@ def arg(
 
         To prevent the automatic creation of the flag in these cases, pass `make_flag=False`.
 
+    - `concurrent` (`Literal["thread", "process"] | Executor | None`, optional). Defaults to `None`.
+        Whether to convert the elements of lists of values (see `nargs`) concurrently, with the `type` function called
+        in a thread pool (`"thread"`, for I/O bound converters), in a process pool (`"process"`, for CPU bound
+        converters, which must be picklable) or in a given `concurrent.futures.Executor`. The pools are created once
+        and shared by all arguments. The values keep the order of the command line and the errors are the same of the
+        serial conversion (the first invalid value is reported). By default, the elements are converted serially::
+
+            >>> @dataparser
+            ... class Args:
+            ...     manifests: list[Manifest] = arg(nargs="+", type=load_manifest, concurrent="thread")
+            ...
+
+    - `container` (`Literal["array", "numpy"] | None`, optional). Defaults to `None`.
+        Whether to collect the values of a numeric list (with `nargs` equal to `"*"`, `"+"` or an integer and `type`
+        equal to `int` or `float`, usually taken from a `list[int]` or `list[float]` annotation) into an
+        `array.array` (`"array"`, with the type codes `"q"` or `"d"`) or a NumPy array (`"numpy"`, with the types
+        `int64` or `float64`), instead of a list of Python numbers. All values are converted at once, which saves time
+        and memory for long lists, e.g. read from argument files. The NumPy arrays require NumPy to be installed. The
+        errors are the same of the conversion of a list (the first invalid value is reported)::
+
+            >>> @dataparser(fromfile_prefix_chars="@")
+            ... class Simulation:
+            ...     loads: list[float] = arg(nargs="+", container="numpy")
+            ...
+            >>> parse(Simulation, ["1.5", "2", "3e2"])
+            Simulation(loads=array([  1.5,   2. , 300. ]))
+
+    - `env` (`str | None`, optional). Defaults to `None`.
+        The name of an environment variable with the value of the argument, which has precedence over the default
+        (and over config files, see the `config_files` parameter of `dataparser()`) and is overridden by the command
+        line. The value is converted as the values of config files (lists of values separated by spaces and boolean
+        flags as `"true"`/`"false"`, `"yes"`/`"no"`, `"on"`/`"off"` or `"1"`/`"0"`) and empty variables are ignored.
+        It can only be used in flags of the main parser (not in positional arguments, which are always parsed from the
+        command line). See also the `env_prefix` parameter of `dataparser()`::
+
+            >>> @dataparser
+            ... class Server:
+            ...     token: str = arg("-t", default="", env="SERVER_TOKEN")
+            ...
+
     Parameters from the original `add_argument()` method
     ----------------------------------------------------
     - `action` (`Literal["store", "store_const", "store_true", "store_false", "append", "append_const", "count", "help", "version", "extend"] | type[Action]`, optional). Defaults to `"store"`.
@@ -1724,10 +1770,12 @@ def subparsers(
 class SubParser:
     defaults: dict[str, Any] | None
     kwargs: dict[str, Any]
+    dataclass: str | None = None
 
 def subparser(
     *,
     defaults: dict[str, Any] | None = None,
+    dataclass: str | None = None,
     aliases: Sequence[str] = ...,
     help: str = ...,
     prog: str | None = None,
@@ -1747,9 +1795,12 @@ def subparser(
     """Helper function to create `dataclass` class variables (`ClassVar`) storing specification about a subparser, used
     later in the method `add_parser()` to add sub commands.
 
-    This function accepts all the parameters of the original `add_parser()` method and an additional parameter named `defaults`,
+    This function accepts all the parameters of the original `add_parser()` method and two additional parameters: `defaults`,
     which receives a dictionary with the subparser-level defaults attributes that are determined without any inspection of the
-    command line.
+    command line, and `dataclass`, which receives an import string of another class defining the subparser arguments.
+
+    The subparser is only created when its name (or one of its aliases) is selected in the command line. The names and
+    help texts of all subparsers are still listed in the help of the main parser.
 
     Parameters
     ----------
@@ -1759,6 +1810,22 @@ def subparser(
 
         The dictionary keys must be defined previously with the `default()` function.
 
+    - `dataclass` (`str | None`, optional). Defaults to `None`.
+        An import string in the form `"module:Class"` of a `dataclass` defining the arguments of the subparser. The module
+        is imported only when the subparser is selected in the command line, so the main parser (and its help) only needs
+        the names and help texts of the subcommands. The instance of the imported class, created with the arguments of the
+        subparser, is stored in the field defined with the `subparsers()` function, which is required in this case::
+
+            >>> @dataparser
+            ... class Args:
+            ...     command: Any = subparsers()
+            ...     train: ClassVar = subparser(dataclass="mypackage.train:TrainArgs", help="train a model")
+            ...
+
+        The parameters of the `dataparser()` decorator of the imported class are used for the subparser, except for `prog`,
+        and can be overridden by the parameters passed to this function. Arguments can not be added to this subparser with
+        `arg(subparser=...)`.
+
     Extra parameters of the original `add_parser()` method
     ------------------------------------------------------
     - `aliases` (`Sequence[str]`, optional).
@@ -1833,6 +1900,163 @@ def default(default: T | None = None) -> T:
     """
     ...
 
+KeywordArguments = tuple[tuple[str, Any], ...]
+
+@dataclass(frozen=True)
+class ArgumentSpec:
+    """Specification of one argument in a `ParserPlan`, i.e., the parameters of one call to `add_argument()`.
+
+    Attributes
+    ----------
+    - `dest` (`str`)
+        The name of the `dataclass` field filled by the argument.
+
+    - `name_or_flags` (`tuple[str, ...]`)
+        The name or the list of option strings passed to `add_argument()`.
+
+    - `kwargs` (`KeywordArguments`)
+        The keyword arguments passed to `add_argument()` (including `default`), as a tuple of `(key, value)` pairs.
+
+    - `group` (`str | int | None`)
+        The key of the argument group (in `ParserPlan.groups`) the argument is added to, if any.
+
+    - `mutually_exclusive_group` (`str | int | None`)
+        The key of the mutually exclusive group (in `ParserPlan.mutually_exclusive_groups`) the argument is added to, if
+        any. It has precedence over `group`.
+
+    - `concurrent` (`str | Executor | None`)
+        The `concurrent` parameter passed to `arg()`, to convert the elements of lists of values concurrently.
+
+    - `container` (`str | None`)
+        The `container` parameter passed to `arg()`, to collect numeric lists of values into arrays.
+
+    - `env` (`str | None`)
+        The name of the environment variable with the value of the argument, from the `env` parameter passed to `arg()`
+        or the `env_prefix` parameter passed to `dataparser()`.
+    """
+
+    dest: str
+    name_or_flags: tuple[str, ...]
+    kwargs: KeywordArguments
+    group: str | int | None = None
+    mutually_exclusive_group: str | int | None = None
+    concurrent: str | Executor | None = None
+    container: str | None = None
+    env: str | None = None
+
+@dataclass(frozen=True)
+class GroupSpec:
+    """Specification of an argument group in a `ParserPlan`, with the keyword arguments of `add_argument_group()`."""
+
+    key: str | int
+    kwargs: KeywordArguments
+
+@dataclass(frozen=True)
+class MutuallyExclusiveGroupSpec:
+    """Specification of a mutually exclusive group in a `ParserPlan`, with the keyword arguments of
+    `add_mutually_exclusive_group()`. The group is added to the argument group with key `group` or to the mutually
+    exclusive group with key `mutually_exclusive_group`, if any of them is given, otherwise to the parser itself.
+    """
+
+    key: str | int
+    kwargs: KeywordArguments
+    group: str | int | None = None
+    mutually_exclusive_group: str | int | None = None
+
+@dataclass(frozen=True)
+class SubParserSpec:
+    """Specification of a subparser in a `ParserPlan`, with the keyword arguments of `add_parser()`, the defaults set with
+    `set_defaults()` and the nested plan of its arguments. When `dataclass` is given, the arguments are taken from the plan
+    of the class imported from this `"module:Class"` string, when the subparser is selected.
+    """
+
+    name: str
+    kwargs: KeywordArguments
+    defaults: KeywordArguments | None
+    plan: ParserPlan
+    dataclass: str | None = None
+
+@dataclass(frozen=True)
+class ParserPlan:
+    """Immutable specification of an `ArgumentParser`, compiled once per `dataclass` by `make_plan()`.
+
+    The plan holds everything needed to create the parser: the keyword arguments of the `ArgumentParser` constructor, the
+    ordered arguments, the argument groups, the mutually exclusive groups, the parser-level defaults and the subparsers
+    tree. All keyword arguments are stored as tuples of `(key, value)` pairs, so the plan can be compared, pickled and
+    (when all values are hashable) hashed.
+
+    Attributes
+    ----------
+    - `parser_kwargs` (`KeywordArguments`)
+        The keyword arguments passed to the `ArgumentParser` constructor.
+
+    - `arguments` (`tuple[ArgumentSpec, ...]`)
+        The arguments, in the order they are added to the parser.
+
+    - `groups` (`tuple[GroupSpec, ...]`)
+        The argument groups, in the order they are created.
+
+    - `mutually_exclusive_groups` (`tuple[MutuallyExclusiveGroupSpec, ...]`)
+        The mutually exclusive groups, in the order they are created.
+
+    - `defaults` (`KeywordArguments`)
+        The parser-level defaults, defined with the `default()` function and passed to `set_defaults()`.
+
+    - `subparsers_kwargs` (`KeywordArguments | None`)
+        The keyword arguments passed to `add_subparsers()`, or `None` if the parser has no subparsers.
+
+    - `subparsers` (`tuple[SubParserSpec, ...]`)
+        The subparsers, in the order they are created.
+
+    - `help_formatter` (`Callable[[str], str] | None`)
+        The `help_formatter` passed to the `dataparser()` decorator. The help texts of the arguments are stored unformatted
+        in the plan and this function is only applied (once per text) when the help is rendered, by the formatter class of
+        the parser.
+    """
+
+    parser_kwargs: KeywordArguments = ()
+    arguments: tuple[ArgumentSpec, ...] = ()
+    groups: tuple[GroupSpec, ...] = ()
+    mutually_exclusive_groups: tuple[MutuallyExclusiveGroupSpec, ...] = ()
+    defaults: KeywordArguments = ()
+    subparsers_kwargs: KeywordArguments | None = None
+    subparsers: tuple[SubParserSpec, ...] = ()
+    help_formatter: Callable[[str], str] | None = None
+
+    def materialize(self, parser: ArgumentParser | None = None) -> ArgumentParser:
+        """Creates the `ArgumentParser` described by the plan.
+
+        Parameters
+        ----------
+        - `parser` (`ArgumentParser | None`, optional). Defaults to `None`.
+            Existing parser to add arguments to. By default creates a new parser with `parser_kwargs`.
+
+        Returns
+        -------
+        `ArgumentParser`:
+            The new `ArgumentParser` object or the existing parser with added arguments.
+        """
+        ...
+
+def make_plan(cls: type) -> ParserPlan:
+    """Compiles the `ParserPlan` of `cls`, i.e., the specification of its `ArgumentParser`.
+
+    The fields of `cls`, its `ClassVar` definitions and the parameters passed to the `dataparser()` decorator are inspected
+    only once: the plan is cached and later calls return the same object. The function `make_parser()` is equivalent to
+    `make_plan(cls).materialize(parser)`.
+
+    Parameters
+    ----------
+    - `cls` (`type`)
+        A `dataclass` according to which the plan is compiled.
+
+    Returns
+    -------
+    `ParserPlan`:
+        The immutable plan of the argument parser of `cls`.
+    """
+    ...
+
 def make_parser(cls: type, *, parser: ArgumentParser | None = None) -> ArgumentParser:
     """Creates a `ArgumentParser` with command-line arguments according to the fields of `cls`.
 
@@ -1854,21 +2078,114 @@ def make_parser(cls: type, *, parser: ArgumentParser | None = None) -> ArgumentP
     """
     ...
 
-def parse(cls: type[Class], args: Sequence[str] | None = None, *, parser: ArgumentParser | None = None) -> Class:
+class ParseError(Exception):
+    """Error raised by `parse()` and `parse_known()` with `raise_errors=True`, instead of printing the usage message and
+    exiting the program.
+
+    The usage message is only formatted when the attribute `usage` is accessed, so rejecting invalid input does not cost
+    more than the error reason. The string of the exception is the same message printed by `argparse` after
+    `"error: "`, e.g. `"argument -c/--count: invalid int value: 'x'"`.
+
+    Attributes
+    ----------
+    - `reason` (`str`)
+        The reason of the error, e.g. `"invalid int value: 'x'"`.
+
+    - `argument` (`str | None`)
+        The name of the argument with the error, e.g. `"-c/--count"`, or `None` for errors not related to a single
+        argument (e.g. missing required arguments).
+
+    - `token` (`str | None`)
+        The offending command line string, when it is known, e.g. `"x"`.
+
+    - `parser` (`ArgumentParser | None`)
+        The parser (or subparser) that found the error.
+
+    - `line` (`int | None`)
+        The number of the command line with the error, in errors raised by `parse_stream()`.
+
+    - `usage` (`str`)
+        The usage message of the parser, formatted when accessed.
+    """
+
+    reason: str
+    argument: str | None
+    token: str | None
+    parser: ArgumentParser | None
+    line: int | None
+
+    def __init__(
+        self, reason: str, argument: str | None = None, token: str | None = None, parser: ArgumentParser | None = None
+    ) -> None: ...
+    @property
+    def usage(self) -> str: ...
+
+def split_command(command: str) -> list[str]:
+    """Split a command string into a list of arguments, using the rules of a POSIX shell.
+
+    The result (and the `ValueError` raised for unclosed quotations or a final backslash) is the same of `shlex.split()`,
+    but much faster: strings without quotes and backslashes are split with `str.split()`, and the others are split
+    with a single regular expression, instead of the character-at-a-time lexer of `shlex`.
+
+    Parameters
+    ----------
+    - `command` (`str`)
+        The command string, e.g. `"deploy --service 'web api' -r 3"`.
+
+    Returns
+    -------
+    `list[str]`:
+        The list of arguments, e.g. `["deploy", "--service", "web api", "-r", "3"]`.
+    """
+    ...
+
+def parse(
+    cls: type[Class],
+    args: Sequence[str] | str | None = None,
+    *,
+    parser: ArgumentParser | None = None,
+    backend: Literal["argparse", "table"] | None = None,
+    raise_errors: bool = False,
+) -> Class:
     """Parse command line arguments according to the fields of `cls` and populate it.
 
     Accepts classes decorated with `dataclass`.
 
+    When the parser of `cls` has only simple arguments (positionals, flags storing a single value and boolean flags), the
+    arguments are parsed by a function generated specifically for the class, which calls the class constructor directly.
+    Anything this function does not handle (help, errors, abbreviations, negative numbers etc.) is parsed by `argparse`,
+    so the result is always the same.
+
+    This function is thread safe: it can be called concurrently from many threads (also in the free-threaded build of
+    Python) for the same class, sharing the cached parser, without any lock. The cached parser is never modified when
+    parsing (subparsers are created once, when first selected).
+
     Parameters
     ----------
     - `cls` (`type[Class]`)
         A `dataclass` used as object to take the attributes to parse the command-line arguments.
 
-    - `args` (`Sequence[str] | None`, optional). Defaults to `None`.
-        List of strings to parse. The default is taken from `sys.argv`, like the original `parse_args()` method.
+    - `args` (`Sequence[str] | str | None`, optional). Defaults to `None`.
+        List of strings to parse. The default is taken from `sys.argv`, like the original `parse_args()` method. A single
+        command string may also be passed, which is split into a list of strings with `split_command()`.
 
     - `parser` (`ArgumentParser | None`, optional). Defaults to `None`.
-        Existing parser to add arguments to and parse from.
+        Existing parser to add arguments to and parse from. By default, the parser created for `cls` is taken from the
+        parser cache (see `parser_cache_info()`), and it is only built in the first call.
+
+    - `backend` (`Literal["argparse", "table"] | None`, optional). Defaults to `None`.
+        The parsing engine. With `"table"`, the arguments are parsed in a single pass with option strings looked up in
+        a table, avoiding the regular expressions used by `argparse`, which is faster for long lists of arguments. The
+        table backend supports the common actions (`"store"`, `"store_const"`, `"store_true"`, `"store_false"`,
+        `"append"`, `"append_const"`, `"count"` and `"extend"`), all `nargs` values except `"..."`, argument groups,
+        mutually exclusive groups and subparsers. It produces the same result as `argparse` and anything else
+        (help, errors, abbreviations, `--`, negative numbers, combined short flags etc.) is parsed by `argparse`. When
+        `None`, the backend passed to the `dataparser()` decorator is used (`"argparse"` by default).
+
+    - `raise_errors` (`bool`, optional). Defaults to `False`.
+        Whether to raise a `ParseError` for invalid arguments, instead of printing the usage message and exiting the
+        program (the `--help` and `--version` actions still print their messages and exit). Only supported with parsers
+        created by `dataparsers`, i.e., when the `parser` parameter is not given or is a parser from `make_parser()`.
 
     Returns
     -------
@@ -1878,13 +2195,21 @@ def parse(cls: type[Class], args: Sequence[str] | None = None, *, parser: Argume
     ...
 
 def parse_known(
-    cls: type[Class], args: Sequence[str] | None = None, *, parser: ArgumentParser | None = None, metavar: str | None = None
+    cls: type[Class],
+    args: Sequence[str] | str | None = None,
+    *,
+    parser: ArgumentParser | None = None,
+    metavar: str | None = None,
+    raise_errors: bool = False,
 ) -> tuple[Class, list[str]]:
     """Parse command line arguments according to the fields of `cls` and populate it.
 
     Same as `parse()` except that it  it does not produce an error when extra arguments are present. Instead, it returns a two
     item tuple containing the populated class and the list of remaining argument strings.
 
+    Like `parse()`, this function is thread safe. The parser with the `metavar` in the usage message is created once for
+    each `metavar` and cached together with the parser of `cls`.
+
     Accepts classes decorated with `dataclass`.
 
     Parameters
@@ -1892,16 +2217,22 @@ def parse_known(
     - `cls` (`type[Class]`)
         A `dataclass` used as object to take the attributes to parse the command-line arguments.
 
-    - `args` (`Sequence[str] | None`, optional). Defaults to `None`.
-        List of strings to parse. The default is taken from `sys.argv`, like the original `parse_known_args()` method.
+    - `args` (`Sequence[str] | str | None`, optional). Defaults to `None`.
+        List of strings to parse. The default is taken from `sys.argv`, like the original `parse_known_args()` method. A
+        single command string may also be passed, which is split into a list of strings with `split_command()`.
 
     - `parser` (`ArgumentParser | None`, optional). Defaults to `None`.
-        Existing parser to add arguments to and parse from.
+        Existing parser to add arguments to and parse from. By default, the parser created for `cls` is taken from the
+        parser cache (see `parser_cache_info()`).
 
     - `metavar` (`str | None`, optional). Defaults to `None`.
         A name to represent extra remaining arguments that could be present in command line, in the usage message.
         By default `None` and no name is printed.
 
+    - `raise_errors` (`bool`, optional). Defaults to `False`.
+        Whether to raise a `ParseError` for invalid arguments, instead of printing the usage message and exiting the
+        program, like in `parse()`.
+
     Returns
     -------
     `tuple[Class, list[str]]`:
@@ -1909,6 +2240,261 @@ def parse_known(
     """
     ...
 
+async def parse_async(
+    cls: type[Class],
+    args: Sequence[str] | str | None = None,
+    *,
+    parser: ArgumentParser | None = None,
+    raise_errors: bool = False,
+) -> Class:
+    """Parse command line arguments according to the fields of `cls` and populate it, awaiting asynchronous converters.
+
+    Same as `parse()`, except that the `type` of the arguments (passed to `arg()`) can be an asynchronous function
+    (e.g. `async def user(name: str) -> User`), to validate or resolve values with I/O without blocking the event loop.
+    The command line is first parsed with `argparse` and then all the values returned by asynchronous converters are
+    awaited concurrently, with `asyncio.gather()`. The errors raised by them (`ArgumentTypeError`, `TypeError` or
+    `ValueError`) and the `choices` of the arguments are reported like in `parse()`, in the order of the command line.
+
+    Parameters
+    ----------
+    - `cls` (`type[Class]`)
+        A `dataclass` used as object to take the attributes to parse the command-line arguments.
+
+    - `args` (`Sequence[str] | str | None`, optional). Defaults to `None`.
+        List of strings (or a command string) to parse. The default is taken from `sys.argv`.
+
+    - `parser` (`ArgumentParser | None`, optional). Defaults to `None`.
+        Existing parser to add arguments to and parse from. Must be a parser created by `make_parser()`. By default, the
+        parser created for `cls` is taken from the parser cache.
+
+    - `raise_errors` (`bool`, optional). Defaults to `False`.
+        Whether to raise a `ParseError` for invalid arguments, instead of printing the usage message and exiting the
+        program, like in `parse()`.
+
+    Returns
+    -------
+    `Class`:
+        The populated `dataclass` with argument values.
+    """
+    ...
+
+def parse_many(
+    cls: type[Class],
+    argvs: Iterable[Sequence[str] | str],
+    *,
+    workers: int | None = None,
+    backend: Literal["argparse", "table"] | None = None,
+) -> list[Class | Exception | SystemExit]:
+    """Parse many lists of command line arguments according to the fields of `cls`, with the same parser.
+
+    The parser of `cls` is taken from the parser cache (it is built only once) and each list of arguments is parsed like
+    in `parse()` with `raise_errors=True`. An error in one of the lists does not abort the batch: the exception (usually
+    a `ParseError`) is returned in the place of the populated class. Actions that exit the program, like `--help` and
+    `--version`, print their messages and the `SystemExit` exception is returned in their place.
+
+    Parameters
+    ----------
+    - `cls` (`type[Class]`)
+        A `dataclass` used as object to take the attributes to parse the command-line arguments.
+
+    - `argvs` (`Iterable[Sequence[str] | str]`)
+        The lists of strings to parse, or command strings, which are split with `split_command()`.
+
+    - `workers` (`int | None`, optional). Defaults to `None`.
+        Number of worker processes used to parse the lists in parallel (with a `ProcessPoolExecutor`), which pays off
+        for expensive type converters. The class `cls`, its converters and the results must be picklable (e.g. defined
+        at the top level of a module). By default, all lists are parsed in the current process. It must be a positive
+        integer.
+
+    - `backend` (`Literal["argparse", "table"] | None`, optional). Defaults to `None`.
+        The parsing engine, like in `parse()`.
+
+    Returns
+    -------
+    `list[Class | Exception | SystemExit]`:
+        The populated classes or the exceptions raised, in the same order of `argvs`.
+    """
+    ...
+
+def parse_stream(
+    cls: type[Class],
+    file: IO[str] | None = None,
+    *,
+    separator: str = "\n",
+    backend: Literal["argparse", "table"] | None = None,
+    raise_errors: bool = False,
+) -> Iterator[Class]:
+    """Parse a stream of command lines according to the fields of `cls`, yielding the populated classes one at a time.
+
+    The command lines are read lazily from a text file object, so any number of them is parsed in constant memory. Each
+    line is split with `split_command()` (like in a POSIX shell) and parsed like in `parse()`, with the parser
+    taken from the parser cache. Blank lines are skipped.
+
+    Parameters
+    ----------
+    - `cls` (`type[Class]`)
+        A `dataclass` used as object to take the attributes to parse the command-line arguments.
+
+    - `file` (`IO[str] | None`, optional). Defaults to `None`.
+        The text file object to read the command lines from. By default, the command lines are read from `sys.stdin`.
+
+    - `separator` (`str`, optional). Defaults to `"\n"`.
+        The string separating the command lines, e.g. `"\0"` for NUL separated command lines (which may contain newlines
+        in quoted arguments).
+
+    - `backend` (`Literal["argparse", "table"] | None`, optional). Defaults to `None`.
+        The parsing engine, like in `parse()`.
+
+    - `raise_errors` (`bool`, optional). Defaults to `False`.
+        Whether to raise a `ParseError` for invalid command lines, instead of printing the usage message and exiting the
+        program. In both cases, the number of the line (starting at 1) is reported in the error message and in the
+        attribute `line` of the `ParseError`.
+
+    Returns
+    -------
+    `Iterator[Class]`:
+        A generator of the populated classes, one for each non blank command line.
+    """
+    ...
+
+def completion_script(cls: type, shell: Literal["bash", "zsh", "fish"], *, prog: str | None = None) -> str:
+    """Generates a standalone shell completion script for the command line interface defined by `cls`.
+
+    The script is generated from the parser of `cls` (see `make_parser()`), walking all sub-commands, and the completion
+    is served entirely by the shell, without starting Python. It completes the options of each sub-command (with the
+    help texts as descriptions in `fish`), the names and aliases of sub-commands, the `choices` of arguments and paths
+    for arguments with `type` equal to a `pathlib.Path` (or any `PurePath` subclass) or a `FileType`. The number of
+    values taken by the options (`nargs`) is used to locate the sub-command and the positional argument being completed.
+    The options must be prefixed with `-` and options hidden with `help=SUPPRESS` are not completed::
+
+        >>> with open("/etc/bash_completion.d/prog", "w") as file:
+        ...     file.write(completion_script(Args, "bash", prog="prog"))
+        ...
+
+    The `bash` script is sourced (or installed in the `bash_completion.d` directory), the `zsh` script is sourced or
+    installed as the `_prog` file in a directory of `$fpath` and the `fish` script is installed as `prog.fish` in
+    `~/.config/fish/completions`. The script must be generated again when the interface changes.
+
+    Parameters
+    ----------
+    - `cls` (`type`)
+        A `dataclass` used as object to take the attributes to create the parser.
+
+    - `shell` (`Literal["bash", "zsh", "fish"]`)
+        The shell of the completion script.
+
+    - `prog` (`str | None`, optional). Defaults to `None`.
+        The name of the command completed by the script. By default, the `prog` of the parser is used.
+
+    Returns
+    -------
+    `str`:
+        The source of the completion script.
+    """
+    ...
+
+def completions(cls: type, line: str, point: int | None = None) -> list[str]:
+    """Returns the completions of the word at the cursor in a partial command line of the interface defined by `cls`.
+
+    The words before the cursor are read like in the scripts of `completion_script()`, to find the selected sub-command
+    and the argument being completed, but only the parser of the selected sub-command is created (and, for sub-commands
+    defined with the `dataclass` parameter of `subparser()`, only its class is imported). The completions are the
+    options, the names of sub-commands, the `choices` of the argument or the paths starting with the word at the cursor
+    (for arguments with `type` equal to a `pathlib.Path` or a `FileType`), with a trailing separator in directories::
+
+        >>> completions(Args, "prog run --mode f")
+        ['fast']
+
+    Parameters
+    ----------
+    - `cls` (`type`)
+        A `dataclass` used as object to take the attributes to create the parser.
+
+    - `line` (`str`)
+        The command line, starting with the name of the program, which may end with an incomplete word (e.g. with an
+        unclosed quote).
+
+    - `point` (`int | None`, optional). Defaults to `None`.
+        The position of the cursor in `line`. By default, the cursor is at the end of the line.
+
+    Returns
+    -------
+    `list[str]`:
+        The completions of the word at the cursor.
+    """
+    ...
+
+def autocomplete(cls: type) -> None:
+    """Answers a completion request of the shell and exits the program, or returns if there is no completion request.
+
+    The completion requests are identified by the environment variable `COMP_LINE` (with the command line) and,
+    optionally, `COMP_POINT` (with the position of the cursor), set by `bash` when the program is registered with
+    `complete -C`. The completions (see `completions()`) are written to `sys.stdout`, one per line. The function should
+    be called at the top of the program, before importing heavy modules, so the completion requests are answered
+    quickly (`dataparsers` itself imports only a few light modules)::
+
+        # prog.py
+        from dataparsers import arg, autocomplete, dataparser, parse
+
+        @dataparser
+        class Args:
+            mode: str = arg("-m", choices=["fast", "slow"], default="fast")
+
+        autocomplete(Args)
+
+        import numpy  # not imported in completion requests
+        args = parse(Args)
+
+    The program (`prog`, an executable in the `PATH`) is registered in `bash` with `complete -o filenames -C prog prog`,
+    in `zsh` with the same command after `autoload -U +X bashcompinit && bashcompinit` and in `fish` with
+    `complete -c prog -f -a '(COMP_LINE=(commandline -cp) prog)'`.
+
+    Parameters
+    ----------
+    - `cls` (`type`)
+        A `dataclass` used as object to take the attributes to create the parser.
+    """
+    ...
+
+class CacheInfo(NamedTuple):
+    """Statistics of the parser cache, returned by `parser_cache_info()`."""
+
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+def parser_cache_info() -> CacheInfo:
+    """Returns the statistics of the cache of parsers used by `parse()` and `parse_known()`.
+
+    The functions `parse()` and `parse_known()` build the parser of a class only once and reuse it in later calls. The
+    parsers are kept in a bounded cache whose keys are weak references to the classes, so that classes created
+    dynamically can still be garbage collected. The parsers found in the cache are read without any lock, so the number
+    of `hits` is approximate when the functions are called concurrently from many threads.
+
+    Returns
+    -------
+    `CacheInfo`:
+        A named tuple with the number of `hits` and `misses`, the maximum size `maxsize` and the current size `currsize`
+        of the cache.
+    """
+    ...
+
+def clear_parser_cache() -> None:
+    """Removes all parsers from the parser cache and resets its statistics."""
+    ...
+
+def set_parser_cache_size(maxsize: int | None) -> None:
+    """Sets the maximum number of parsers kept in the parser cache.
+
+    Parameters
+    ----------
+    - `maxsize` (`int | None`)
+        The maximum number of parsers in the cache (default `128`). When the cache is full, the oldest parser not used
+        since the last eviction is discarded (an approximation of the least recently used). If `None`, the cache is unbounded. If `0`, the caching is disabled.
+    """
+    ...
+
 @overload
 def dataparser(cls: type[Class]) -> type[Class]: ...
 @overload
@@ -1918,6 +2504,14 @@ def dataparser(
     required_mutually_exclusive_groups: dict[str | int, bool] | None = None,
     default_bool: bool = False,
     help_formatter: Callable[[str], str] | None = None,
+    disk_cache: bool | str | PathLike[str] = False,
+    backend: Literal["argparse", "table"] = "argparse",
+    frozen: bool = False,
+    slots: bool = False,
+    tuples: bool = False,
+    config_files: Sequence[str | PathLike[str]] = (),
+    config_section: str | None = None,
+    env_prefix: str | None = None,
     prog: str | None = None,
     usage: str | None = None,
     description: str | None = None,
@@ -1934,8 +2528,9 @@ def dataparser(
 ) -> Callable[[type[Class]], type[Class]]:
     """A wrapper around `dataclass` for passing parameters to the `ArgumentParser` constructor.
 
-    This function accepts all parameters of the original `ArgumentParser` constructor. Four additional parameters may be
-    supplied, namely `groups_descriptions`, `required_mutually_exclusive_groups`, `default_bool` and `help_formatter`.
+    This function accepts all parameters of the original `ArgumentParser` constructor. Additional parameters may be
+    supplied, namely `groups_descriptions`, `required_mutually_exclusive_groups`, `default_bool`, `help_formatter`,
+    `disk_cache`, `backend`, `frozen`, `slots`, `tuples`, `config_files`, `config_section` and `env_prefix`.
 
     Parameters
     ----------
@@ -1955,7 +2550,79 @@ def dataparser(
     - `help_formatter` (`Callable[[str], str] | None`, optional). Defaults to `None`.
         A formatter function used to format the help text in argument descriptions. When it is passed, the
         `formatter_class` parameter passed to the `ArgumentParser` constructor is assumed to be
-        `RawDescriptionHelpFormatter`.
+        `RawDescriptionHelpFormatter`. The function is only called when the help is rendered, once for each help text.
+
+    - `disk_cache` (`bool | str | PathLike[str]`, optional). Defaults to `False`.
+        Whether to store the compiled `ParserPlan` of the class in an on-disk cache, to reduce the start up time of
+        short-lived command line programs. If `True`, the cache is stored in the directory `dataparsers` inside
+        `$XDG_CACHE_HOME` (or `~/.cache`). A path may be given to use another cache directory. The cached plan is
+        reused while the source file of the class module and the `dataparsers` module are not modified, otherwise the
+        plan is compiled again. Classes defined inside functions and plans containing objects that can not be pickled
+        (e.g. lambdas) are not cached.
+
+    - `backend` (`Literal["argparse", "table"]`, optional). Defaults to `"argparse"`.
+        The parsing engine used by `parse()` for the class. See the `backend` parameter of the `parse()` function.
+
+    - `frozen` (`bool`, optional). Defaults to `False`.
+        Passed to `dataclass`: whether the parsed instances are immutable (and hashable).
+
+    - `slots` (`bool`, optional). Defaults to `False`.
+        Passed to `dataclass`: whether the class is created with `__slots__`, so the parsed instances have no
+        `__dict__` and use less memory. The parameters `frozen` and `slots` can not be applied to a class already
+        decorated with `dataclass`.
+
+    - `tuples` (`bool`, optional). Defaults to `False`.
+        Whether to store the lists of values (e.g. of arguments with `nargs` or `action="append"`) as tuples in the
+        parsed instances, which are smaller than lists and, along with `frozen=True`, make the instances hashable::
+
+            >>> @dataparser(frozen=True, slots=True, tuples=True)
+            ... class Job:
+            ...     name: str
+            ...     tags: list[str] = arg("-t", nargs="+", default=None)
+            ...
+            >>> parse(Job, ["build", "-t", "gpu", "nightly"])
+            Job(name='build', tags=('gpu', 'nightly'))
+
+    - `config_files` (`Sequence[str | PathLike[str]]`, optional). Defaults to `()`.
+        Paths of TOML (`.toml`, which requires Python 3.11 or the package `tomli`), JSON (`.json`) or INI (`.ini` or
+        `.cfg`) files with values for the fields of the class, which have precedence over the defaults (of `arg()` and
+        `default()`) and are overridden by the arguments of the command line. The files are loaded in order, so the
+        values of the last files have precedence, and missing files are ignored. The keys are the names of the fields
+        (dashes are replaced by underscores) and the string values are converted with the `type` of the arguments (lists
+        of values may be given as strings of values separated by spaces and boolean flags as `"true"`/`"false"`,
+        `"yes"`/`"no"`, `"on"`/`"off"` or `"1"`/`"0"`). Unknown keys and invalid values are reported as parsing errors.
+        The arguments of sub-commands (defined with the `subparser` parameter of `arg()`) can not be set in config files
+        (their keys are also reported as errors) and required arguments must still be given in the command line::
+
+            >>> @dataparser(config_files=["/etc/sim.toml", "~/.config/sim.toml", "sim.toml"])
+            ... class Simulation:
+            ...     seed: int = arg("-s", default=0)
+            ...
+
+        The loaded files are cached in the process while they are not modified (checked with the modification time and
+        the size of the files, on each parse). With `disk_cache`, they are also cached on disk, so short-lived programs
+        do not parse large config files again on every start up.
+
+    - `config_section` (`str | None`, optional). Defaults to `None`.
+        The table of the TOML and JSON files with the values of the fields (e.g. `"tool.sim"`), or the section of the
+        INI files (by default, the top level table of TOML and JSON files and the `DEFAULT` section of INI files). Other
+        tables in the files are ignored.
+
+    - `env_prefix` (`str | None`, optional). Defaults to `None`.
+        A prefix to read the values of all flags of the main parser (not the positional arguments) from environment
+        variables named with the prefix and the name of the field in upper case, e.g. `APP_PORT` for the field `port`
+        and the prefix `"APP_"` (the `env` parameter of `arg()` sets another name for a single argument). The values of
+        environment variables have precedence over config files and defaults, and are overridden by the command line.
+        The names of the variables are computed once, when the parser is compiled, and the values are read on each
+        parse::
+
+            >>> @dataparser(env_prefix="APP_")
+            ... class App:
+            ...     port: int = arg("-p", default=8000)
+            ...
+            >>> os.environ["APP_PORT"] = "9000"
+            >>> parse(App, [])
+            App(port=9000)
 
     Parameters from the original `ArgumentParser` class
     ---------------------------------------------------
@@ -2249,6 +2916,12 @@ def dataparser(
         (e.g. `locale.getpreferredencoding(False)` and `"strict"`) to filesystem encoding and error handler.
         Arguments file should be encoded in UTF-8 instead of ANSI Codepage on Windows.
 
+        The parsers created by `dataparsers` read the argument files in chunks of a memory-mapped file (with the
+        filesystem encoding and error handler, in any Python version), without loading the whole file. Files
+        containing NUL characters are read as NUL separated arguments (e.g. the output of `find -print0`), so the
+        arguments may contain line breaks, and gzip compressed files are decompressed in memory. This reader is not
+        used when the method `convert_arg_line_to_args()` is overridden.
+
     - `argument_default` (`Any`, optional). Defaults to `None`.
         The global default value for arguments (default: `None`).
 
@@ -1,14 +1,80 @@
 # %% ################################################# dataparsers region ######################################################
+import copy
+import functools
 import gettext
+import importlib
+import importlib.util
+import inspect
+import mmap
+import os
+import pickle
+import re
+import shlex
 import shutil
 import sys
 import textwrap
+import threading
+import weakref
+from contextvars import ContextVar
 from argparse import _ArgumentGroup  # only for typing annotation
-from argparse import ArgumentParser, RawTextHelpFormatter, _MutuallyExclusiveGroup, _SubParsersAction
+from argparse import (
+    SUPPRESS,
+    Action,
+    ArgumentError,
+    ArgumentParser,
+    ArgumentTypeError,
+    FileType,
+    HelpFormatter,
+    Namespace,
+    RawTextHelpFormatter,
+    ONE_OR_MORE,
+    OPTIONAL,
+    PARSER,
+    ZERO_OR_MORE,
+    _UNRECOGNIZED_ARGS_ATTR,
+    _AppendAction,
+    _AppendConstAction,
+    _CountAction,
+    _ExtendAction,
+    _HelpAction,
+    _MutuallyExclusiveGroup,
+    _StoreAction,
+    _StoreConstAction,
+    _StoreFalseAction,
+    _StoreTrueAction,
+    _SubParsersAction,
+    _VersionAction,
+)
+from array import array
+from collections import deque
 from collections.abc import Mapping
-from dataclasses import Field, dataclass, field, fields, is_dataclass
+from itertools import repeat
+from math import inf
+from dataclasses import _FIELD, _FIELD_CLASSVAR, MISSING, Field, dataclass, field, fields, is_dataclass, replace
 from types import MappingProxyType, UnionType
-from typing import Any, Callable, ClassVar, Sequence, TypeVar, Union, cast, get_args, get_origin, get_type_hints, overload
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ClassVar,
+    ForwardRef,
+    IO,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    NoReturn,
+    TYPE_CHECKING,
+    Sequence,
+    TypeVar,
+    Union,
+    cast,
+    get_args,
+    get_origin,
+    overload,
+)
+
+if TYPE_CHECKING:  # modules used by a few functions are imported only when used, for a fast start up (e.g. completion)
+    from concurrent.futures import Executor
 
 Class = TypeVar("Class", covariant=True)
 
@@ -23,10 +89,29 @@ def arg(
     group_title: str | int | None = None,
     mutually_exclusive_group_id: str | int | None = None,
     make_flag: bool | None = None,
+    concurrent: "str | Executor | None" = None,
+    container: str | None = None,
+    env: str | None = None,
     **kwargs,
 ) -> Any:
     is_flag = False
 
+    if env is not None and subparser is not None:
+        raise ValueError("The argument `env` can only be used in arguments of the main parser")
+
+    if isinstance(concurrent, str) and concurrent not in _CONCURRENT_EXECUTORS:
+        raise ValueError(f"The argument `concurrent` must be an `Executor` or one of {_CONCURRENT_EXECUTORS}")
+
+    if container is not None:
+        if container not in _CONTAINERS:
+            raise ValueError(f"The argument `container` must be one of {_CONTAINERS}")
+        if kwargs.get("nargs", None) not in [ZERO_OR_MORE, ONE_OR_MORE] and type(kwargs.get("nargs", None)) is not int:
+            raise ValueError("The argument `container` requires `nargs` to be `'*'`, `'+'` or an integer")
+        if concurrent is not None:
+            raise ValueError("The arguments `container` and `concurrent` can not be used together")
+        if container == "numpy" and importlib.util.find_spec("numpy") is None:
+            raise ImportError("The container 'numpy' requires NumPy to be installed")
+
     if name_or_flags:
         if not all(n.startswith("-") for n in name_or_flags):
             raise ValueError(
@@ -59,6 +144,9 @@ def arg(
         "mutually_exclusive_group_id": mutually_exclusive_group_id,
         "is_flag": is_flag,
         "make_flag": make_flag,
+        "concurrent": concurrent,
+        "container": container,
+        "env": env,
         "argument_kwargs": kwargs,
     }
 
@@ -86,10 +174,25 @@ def subparsers(**kwargs) -> Any:
 class SubParser:
     defaults: dict[str, Any] | None
     kwargs: Mapping[str, Any]
+    dataclass: str | None = None
+
 
+def subparser(*, defaults: dict[str, Any] | None = None, dataclass: str | None = None, **kwargs) -> Any:
+    if dataclass is not None:
+        module_name, _, qualname = dataclass.partition(":")
+        if not module_name or not qualname:
+            raise ValueError(f"The argument `dataclass` must be an import string like 'module:Class', not {dataclass!r}")
+    return field(default=SubParser(defaults=defaults, kwargs=MappingProxyType(kwargs), dataclass=dataclass))
 
-def subparser(*, defaults: dict[str, Any] | None = None, **kwargs) -> Any:
-    return field(default=SubParser(defaults=defaults, kwargs=MappingProxyType(kwargs)))
+
+def _import_dataclass(import_string: str) -> type:
+    module_name, _, qualname = import_string.partition(":")
+    obj: Any = importlib.import_module(module_name)
+    for attribute in qualname.split("."):
+        obj = getattr(obj, attribute)
+    if not isinstance(obj, type) or not is_dataclass(obj):
+        raise TypeError(f"The object imported from {import_string!r} is not a dataclass")
+    return obj
 
 
 def default(default=None):
@@ -107,6 +210,14 @@ def dataparser(
     required_mutually_exclusive_groups: dict[str | int, bool] | None = None,
     default_bool: bool = False,
     help_formatter: Callable[[str], str] | None = None,
+    disk_cache: bool | str | os.PathLike[str] = False,
+    backend: str = "argparse",
+    frozen: bool = False,
+    slots: bool = False,
+    tuples: bool = False,
+    config_files: Sequence[str | os.PathLike[str]] = (),
+    config_section: str | None = None,
+    env_prefix: str | None = None,
     **kwargs,
 ) -> Callable[[type[Class]], type[Class]]: ...
 
@@ -118,6 +229,14 @@ def dataparser(
     required_mutually_exclusive_groups: dict[str | int, bool] | None = None,
     default_bool: bool = False,
     help_formatter: Callable[[str], str] | None = None,
+    disk_cache: bool | str | os.PathLike[str] = False,
+    backend: str = "argparse",
+    frozen: bool = False,
+    slots: bool = False,
+    tuples: bool = False,
+    config_files: Sequence[str | os.PathLike[str]] = (),
+    config_section: str | None = None,
+    env_prefix: str | None = None,
     **kwargs,
 ) -> type[Class] | Callable[[type[Class]], type[Class]]:
     if cls is not None:
@@ -130,182 +249,2059 @@ def dataparser(
     if required_mutually_exclusive_groups is None:
         required_mutually_exclusive_groups = {}
 
+    _check_backend(backend)
+    config_files = tuple(os.path.expanduser(os.fspath(path)) for path in config_files)
+    for path in config_files:
+        _config_file_format(path)
+
     def wrap(cls: type[Class]) -> type[Class]:
-        cls = dataclass(cls) if not is_dataclass(cls) else cls
+        if not is_dataclass(cls):
+            cls = dataclass(cls, frozen=frozen, slots=slots)
+        elif (frozen and not cls.__dataclass_params__.frozen) or (slots and "__slots__" not in cls.__dict__):
+            raise ValueError(
+                "The parameters `frozen` and `slots` can not be applied to a class already decorated with `dataclass`"
+            )
         setattr(
             cls,
             "__dataparsers_params__",
-            (kwargs, groups_descriptions, required_mutually_exclusive_groups, default_bool, help_formatter),
+            _DataParserParams(
+                parser_kwargs=kwargs,
+                groups_descriptions=groups_descriptions,
+                required_mutually_exclusive_groups=required_mutually_exclusive_groups,
+                default_bool=default_bool,
+                help_formatter=help_formatter,
+                disk_cache=disk_cache,
+                backend=backend,
+                tuples=tuples,
+                config_files=config_files,
+                config_section=config_section,
+                env_prefix=env_prefix,
+            ),
         )
         return cls
 
     return wrap
 
 
-def make_parser(cls: type, *, parser: ArgumentParser | None = None) -> ArgumentParser:
-    kwargs, groups_descriptions, required_groups_status, default_bool, help_formatter = getattr(
-        cls, "__dataparsers_params__", ({}, {}, {}, False, None)
-    )
+@dataclass(frozen=True)
+class _DataParserParams:
+    parser_kwargs: dict[str, Any] = field(default_factory=dict)
+    groups_descriptions: dict[str | int, str] = field(default_factory=dict)
+    required_mutually_exclusive_groups: dict[str | int, bool] = field(default_factory=dict)
+    default_bool: bool = False
+    help_formatter: Callable[[str], str] | None = None
+    disk_cache: bool | str | os.PathLike[str] = False
+    backend: str = "argparse"
+    tuples: bool = False
+    config_files: tuple[str, ...] = ()
+    config_section: str | None = None
+    env_prefix: str | None = None
 
-    if parser is None:
-        if help_formatter is not None and "formatter_class" not in kwargs:
-            kwargs["formatter_class"] = RawTextHelpFormatter
-        parser = ArgumentParser(**kwargs)
 
-    help_formatter = help_formatter or str
-    groups: dict[str | int, _ArgumentGroup] = {}
-    mutually_exclusive_groups: dict[str | int, _MutuallyExclusiveGroup] = {}
-    subparsers: dict[str, ArgumentParser] = {}
-    subparsers_group: _SubParsersAction | None = None
+_DEFAULT_PARAMS = _DataParserParams()
+
+
+def _get_params(cls: type) -> _DataParserParams:
+    return getattr(cls, "__dataparsers_params__", _DEFAULT_PARAMS)
+
+
+def _as_tuples(value: Any) -> Any:
+    return tuple(map(_as_tuples, value)) if type(value) is list else value
+
+
+def _new_instance(cls: type[Class], values: dict[str, Any]) -> Class:
+    if _get_params(cls).tuples:
+        values = {key: _as_tuples(value) for key, value in values.items()}
+    return cls(**values)
+
+
+def _init_fields(cls: type) -> tuple[str, ...] | None:
+    """Returns the names of the parameters of `__init__`, in order, if it is the one generated by `dataclass` and all
+    fields are positional parameters. Otherwise, returns `None`."""
+    init = cls.__dict__.get("__init__")
+    code = getattr(init, "__code__", None)
+    if code is None or code.co_filename != "<string>" or init.__qualname__ != f"{cls.__qualname__}.__init__":
+        return None
+    dataclass_fields = [f for f in cls.__dataclass_fields__.values() if f._field_type is not _FIELD_CLASSVAR]
+    if any(f._field_type is not _FIELD or not f.init or f.kw_only for f in dataclass_fields):
+        return None
+    return tuple(f.name for f in dataclass_fields)
+
+
+KeywordArguments = tuple[tuple[str, Any], ...]
+
+
+@dataclass(frozen=True)
+class ArgumentSpec:
+    dest: str
+    name_or_flags: tuple[str, ...]
+    kwargs: KeywordArguments
+    group: str | int | None = None
+    mutually_exclusive_group: str | int | None = None
+    concurrent: "str | Executor | None" = None
+    container: str | None = None
+    env: str | None = None
+
+
+@dataclass(frozen=True)
+class GroupSpec:
+    key: str | int
+    kwargs: KeywordArguments
+
+
+@dataclass(frozen=True)
+class MutuallyExclusiveGroupSpec:
+    key: str | int
+    kwargs: KeywordArguments
+    group: str | int | None = None
+    mutually_exclusive_group: str | int | None = None
+
+
+@dataclass(frozen=True)
+class SubParserSpec:
+    name: str
+    kwargs: KeywordArguments
+    defaults: KeywordArguments | None
+    plan: "ParserPlan"
+    dataclass: str | None = None
+
+    def materialize(self, subparsers_group: _SubParsersAction) -> ArgumentParser:
+        plan = self.plan
+        kwargs = dict(self.kwargs)
+        if self.dataclass is not None:
+            plan = make_plan(_import_dataclass(self.dataclass))
+            kwargs = {k: v for k, v in plan.parser_kwargs if k != "prog"} | kwargs
+        if plan.help_formatter is not None:
+            kwargs["formatter_class"] = _deferred_help_formatter_class(
+                kwargs.get("formatter_class", HelpFormatter), plan.help_formatter
+            )
+        subparser = subparsers_group.add_parser(self.name, **kwargs)
+        if self.defaults is not None:
+            subparser.set_defaults(**dict(self.defaults))
+        plan._populate(subparser)
+        return subparser
+
+
+class _LazyParserMap(dict):
+    """Map of subparsers names to parsers, whose values are `SubParserSpec` objects until they are first accessed."""
+
+    def __init__(self, action: "_LazySubParsersAction"):
+        super().__init__()
+        self._action = action
+
+    def __getitem__(self, name: str) -> ArgumentParser:
+        parser = super().__getitem__(name)
+        if isinstance(parser, SubParserSpec):
+            parser = self._action._materialize(name)
+        return parser
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self[name] if name in self else default
+
+    def values(self) -> Any:
+        return [self[name] for name in self]
+
+    def items(self) -> Any:
+        return [(name, self[name]) for name in self]
+
+
+class _LazySubParsersAction(_SubParsersAction):
+    """Subparsers action that creates each subparser only when it is selected in the command line.
+
+    The names, aliases and help texts of the subparsers are registered up front, so they are listed in the help.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._name_parser_map = self.choices = _LazyParserMap(self)
+        self._lock = threading.RLock()
+        self._dataclasses: dict[str, str] = {}
+
+    def add_lazy_parser(self, spec: SubParserSpec) -> None:
+        kwargs = dict(spec.kwargs)
+        aliases = kwargs.get("aliases", ())
+        for name in (spec.name, *aliases):
+            if name in self._name_parser_map:
+                raise ArgumentError(self, _("conflicting subparser: %s") % name)
+        if "help" in kwargs:
+            self._choices_actions.append(self._ChoicesPseudoAction(spec.name, aliases, kwargs["help"]))
+        for name in (spec.name, *aliases):
+            dict.__setitem__(self._name_parser_map, name, spec)
+            if spec.dataclass is not None:
+                self._dataclasses[name] = spec.dataclass
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        if values[0] not in self._dataclasses:
+            return super().__call__(parser, namespace, values, option_string)
+        subnamespace = Namespace()
+        super().__call__(parser, subnamespace, values, option_string)
+        arg_strings = vars(subnamespace).pop(_UNRECOGNIZED_ARGS_ATTR, [])
+        vars(subnamespace).pop(self.dest, None)
+        setattr(namespace, self.dest, _new_instance(_import_dataclass(self._dataclasses[values[0]]), vars(subnamespace)))
+        if arg_strings:
+            vars(namespace).setdefault(_UNRECOGNIZED_ARGS_ATTR, [])
+            getattr(namespace, _UNRECOGNIZED_ARGS_ATTR).extend(arg_strings)
+
+    def _materialize(self, name: str) -> ArgumentParser:
+        with self._lock:
+            parser_map = self._name_parser_map
+            spec = dict.__getitem__(parser_map, name)
+            if not isinstance(spec, SubParserSpec):
+                return spec
+            # the parser is created by a copy of this action, so the names of the subparsers are never missing from
+            # the map for concurrent readers, which access it without the lock
+            scratch = copy.copy(self)
+            scratch._name_parser_map = scratch.choices = {}
+            scratch._choices_actions = []
+            parser = replace(spec, kwargs=tuple((k, v) for k, v in spec.kwargs if k != "help")).materialize(scratch)
+            for key in scratch._name_parser_map:
+                dict.__setitem__(parser_map, key, parser)
+            return parser
+
+
+@dataclass(frozen=True)
+class ParserPlan:
+    parser_kwargs: KeywordArguments = ()
+    arguments: tuple[ArgumentSpec, ...] = ()
+    groups: tuple[GroupSpec, ...] = ()
+    mutually_exclusive_groups: tuple[MutuallyExclusiveGroupSpec, ...] = ()
+    defaults: KeywordArguments = ()
+    subparsers_kwargs: KeywordArguments | None = None
+    subparsers: tuple[SubParserSpec, ...] = ()
+    help_formatter: Callable[[str], str] | None = None
+
+    def materialize(self, parser: ArgumentParser | None = None) -> ArgumentParser:
+        if parser is None:
+            kwargs = dict(self.parser_kwargs)
+            if self.help_formatter is not None:
+                kwargs["formatter_class"] = _deferred_help_formatter_class(
+                    kwargs.get("formatter_class", HelpFormatter), self.help_formatter
+                )
+            parser = _ArgumentParser(**kwargs)
+        elif self.help_formatter is not None and getattr(parser.formatter_class, "_help_formatter", None) is not (
+            self.help_formatter
+        ):
+            parser.formatter_class = _deferred_help_formatter_class(parser.formatter_class, self.help_formatter)
+        self._populate(parser)
+        return parser
+
+    def _populate(self, parser: ArgumentParser) -> None:
+        if self.subparsers_kwargs is not None:
+            subparsers_group = parser.add_subparsers(**{"action": _LazySubParsersAction, **dict(self.subparsers_kwargs)})
+            for spec in self.subparsers:
+                if isinstance(subparsers_group, _LazySubParsersAction):
+                    subparsers_group.add_lazy_parser(spec)
+                else:
+                    spec.materialize(subparsers_group)
+
+        groups: dict[str | int, _ArgumentGroup] = {}
+        for group_spec in self.groups:
+            groups[group_spec.key] = parser.add_argument_group(**dict(group_spec.kwargs))
+
+        mutually_exclusive_groups: dict[str | int, _MutuallyExclusiveGroup] = {}
+        for exclusive_spec in self.mutually_exclusive_groups:
+            container: ArgumentParser | _ArgumentGroup = parser
+            if exclusive_spec.mutually_exclusive_group is not None:
+                container = mutually_exclusive_groups[exclusive_spec.mutually_exclusive_group]
+            elif exclusive_spec.group is not None:
+                container = groups[exclusive_spec.group]
+            mutually_exclusive_groups[exclusive_spec.key] = container.add_mutually_exclusive_group(
+                **dict(exclusive_spec.kwargs)
+            )
+
+        for argument in self.arguments:
+            handler: ArgumentParser | _ArgumentGroup = parser
+            if argument.mutually_exclusive_group is not None:
+                handler = mutually_exclusive_groups[argument.mutually_exclusive_group]
+            elif argument.group is not None:
+                handler = groups[argument.group]
+            action = handler.add_argument(*argument.name_or_flags, **dict(argument.kwargs))
+            if argument.concurrent is not None:
+                action._concurrent = argument.concurrent  # read by `_ArgumentParser._get_values()`
+            if argument.container is not None:
+                action._container = argument.container  # read by `_ArgumentParser._get_values()`
+
+        if self.defaults:
+            parser.set_defaults(**dict(self.defaults))
+
+
+class _DeferredHelp(str):
+    """Help text of an argument, formatted with the `help_formatter` only when the help is rendered."""
+
+    __slots__ = ()
+
+
+@functools.lru_cache(maxsize=128)  # bounded, since the classes and functions may be created dynamically
+def _deferred_help_formatter_class(formatter_class: Any, help_formatter: Callable[[str], str]) -> Any:
+    if not isinstance(formatter_class, type):  # a factory of formatters, e.g. a `lambda` setting the `width`
+
+        def make_formatter(*args, **kwargs):
+            formatter = formatter_class(*args, **kwargs)
+            formatter.__class__ = _deferred_help_formatter_class(type(formatter), help_formatter)
+            return formatter
+
+        return make_formatter
+
+    format_help = functools.lru_cache(maxsize=1024)(help_formatter)
+
+    class DeferredHelpFormatter(formatter_class):
+        _help_formatter = help_formatter
+
+        def _expand_help(self, action: Action) -> str:
+            if isinstance(action.help, _DeferredHelp):
+                action = copy.copy(action)
+                action.help = format_help(action.help)
+            return super()._expand_help(action)
+
+    DeferredHelpFormatter.__name__ = DeferredHelpFormatter.__qualname__ = formatter_class.__name__
+    return DeferredHelpFormatter
+
+
+class _PlanBuilder:
+    def __init__(
+        self, parser_kwargs: Mapping[str, Any] | None = None, help_formatter: Callable[[str], str] | None = None
+    ):
+        self.parser_kwargs = dict(parser_kwargs or {})
+        self.help_formatter = help_formatter
+        self.arguments: list[ArgumentSpec] = []
+        self.groups: dict[str | int, GroupSpec] = {}
+        self.mutually_exclusive_groups: dict[str | int, MutuallyExclusiveGroupSpec] = {}
+        self.defaults: dict[str, Any] = {}
+        self.subparsers_kwargs: dict[str, Any] | None = None
+        self.subparsers: dict[str, tuple[Mapping[str, Any], dict[str, Any] | None, _PlanBuilder]] = {}
+        self.subparsers_dataclasses: dict[str, str] = {}
+
+    def add_group(self, key: str | int, kwargs: Mapping[str, Any]) -> None:
+        if key not in self.groups:
+            self.groups[key] = GroupSpec(key, tuple(kwargs.items()))
+
+    def add_mutually_exclusive_group(
+        self,
+        key: str | int,
+        kwargs: Mapping[str, Any],
+        group: str | int | None,
+        mutually_exclusive_group: str | int | None,
+    ) -> None:
+        if key not in self.mutually_exclusive_groups:
+            self.mutually_exclusive_groups[key] = MutuallyExclusiveGroupSpec(
+                key, tuple(kwargs.items()), group, mutually_exclusive_group
+            )
+
+    def build(self) -> ParserPlan:
+        return ParserPlan(
+            parser_kwargs=tuple(self.parser_kwargs.items()),
+            arguments=tuple(self.arguments),
+            groups=tuple(self.groups.values()),
+            mutually_exclusive_groups=tuple(self.mutually_exclusive_groups.values()),
+            defaults=tuple(self.defaults.items()),
+            subparsers_kwargs=None if self.subparsers_kwargs is None else tuple(self.subparsers_kwargs.items()),
+            help_formatter=self.help_formatter,
+            subparsers=tuple(
+                SubParserSpec(
+                    name=name,
+                    kwargs=tuple(kwargs.items()),
+                    defaults=None if defaults is None else tuple(defaults.items()),
+                    plan=builder.build(),
+                    dataclass=self.subparsers_dataclasses.get(name, None),
+                )
+                for name, (kwargs, defaults, builder) in self.subparsers.items()
+            ),
+        )
+
+
+_field_types: "weakref.WeakKeyDictionary[type, dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+
+def _evaluate_annotation(cls: type, annotation: Any) -> Any:
+    if isinstance(annotation, ForwardRef):  # unresolved names of deferred annotations (PEP 649)
+        annotation = annotation.__forward_arg__
+    if type(annotation) is not str:
+        return annotation
+    module_globals = getattr(sys.modules.get(cls.__module__), "__dict__", {})
+    # the names of the module are found before the attributes of the class (which may be fields named as their types),
+    # like in `typing.get_type_hints()`, passing the module namespace as the locals of `eval()`
+    return eval(annotation, dict(vars(cls)), module_globals)
+
+
+def _field_type(cls: type, fld: Field[Any]) -> Any:
+    with _plans_lock:
+        types = _field_types.get(cls)
+        if types is None:
+            types = _field_types[cls] = {}
+        if fld.name not in types:
+            types[fld.name] = _evaluate_annotation(cls, fld.type)
+        return types[fld.name]
+
+
+def _resolve_field_type(cls: type, fld: Field[Any]) -> Any:
+    field_type = _field_type(cls, fld)
+    if get_origin(field_type) is list or (get_origin(field_type) in [Union, UnionType] and type(None) in get_args(field_type)):
+        field_type = [a for a in get_args(field_type) if a is not type(None)][0]
+    if get_origin(field_type) is Callable or not callable(field_type):
+        field_type = None
+    return field_type
+
+
+def _compile_argument(
+    cls: type, fld: Field[Any], default_bool: bool, defer_help: bool
+) -> tuple[tuple[str, ...], dict[str, Any]]:
+    field_type = _resolve_field_type(cls, fld)
+    argument_kwargs = dict(fld.metadata.get("argument_kwargs", {}))
+    default = fld.default
+
+    if "help" in argument_kwargs and defer_help:
+        argument_kwargs["help"] = _DeferredHelp(argument_kwargs["help"])
+
+    arg_field_has_default = fld.default is not fld.default_factory
+    make_flag = fld.metadata.get("make_flag", True)
+    name_or_flags = fld.metadata.get("name_or_flags", ())
+    if (arg_field_has_default and fld.metadata.get("is_flag", True)) or field_type == bool:
+        if make_flag or (field_type == bool and not name_or_flags):
+            name_or_flags += (f'--{fld.name.replace("_", "-")}',)
+        if field_type == bool and (not arg_field_has_default or default is None):
+            default = default_bool
+
+    if not name_or_flags:  # no flag arg
+        name_or_flags = (fld.name,)
+    else:  # flag arg
+        argument_kwargs["dest"] = fld.name
+
+    if "type" not in argument_kwargs and field_type != bool:
+        argument_kwargs["type"] = field_type
+
+    if "action" not in argument_kwargs and field_type == bool:
+        argument_kwargs["action"] = "store_false" if default else "store_true"
+
+    if field_type == bool:
+        default = argument_kwargs["action"] == "store_false"
+
+    if argument_kwargs.get("action", None) in ["store_const", "store_true", "store_false", "help"]:
+        argument_kwargs.pop("type", None)
+
+    if default is not MISSING:
+        argument_kwargs = dict(default=default, **argument_kwargs)
+
+    return name_or_flags, argument_kwargs
+
+
+def _compile_plan(cls: type) -> ParserPlan:
+    params = _get_params(cls)
+    kwargs = params.parser_kwargs
+    groups_descriptions = params.groups_descriptions
+    required_groups_status = params.required_mutually_exclusive_groups
+    default_bool = params.default_bool
+
+    if params.help_formatter is not None and "formatter_class" not in kwargs:
+        kwargs = dict(kwargs, formatter_class=RawTextHelpFormatter)
+
+    main = _PlanBuilder(kwargs, params.help_formatter)
 
     for fld in fields(cls):
         if fld.metadata.get("is_subparsers_group", False):
-            subparsers_group_kwargs = fld.metadata.get("subparsers_group_kwargs", {})
+            if main.subparsers_kwargs is not None:
+                raise ValueError("Only one field can be defined with the function `subparsers()`")
+            subparsers_group_kwargs = dict(fld.metadata.get("subparsers_group_kwargs", {}))
             subparsers_group_kwargs.pop("dest", None)
-            subparsers_group = parser.add_subparsers(dest=fld.name, **subparsers_group_kwargs)
+            main.subparsers_kwargs = dict(dest=fld.name, **subparsers_group_kwargs)
 
-    handler = parser
-    classvars = {k: v for (k, v) in get_type_hints(cls).items() if v == ClassVar or get_origin(v) is ClassVar}
+    # `ClassVar` annotations are already detected by `dataclass`, without evaluating the other annotations
+    classvars = [f.name for f in getattr(cls, "__dataclass_fields__", {}).values() if f._field_type is _FIELD_CLASSVAR]
     for field_name in classvars:
         if hasattr(cls, field_name):
             attr = getattr(cls, field_name)
             if isinstance(attr, SubParser):
-                subparsers_kwargs = attr.kwargs
-                subparser_defaults = attr.defaults
-                if subparsers_group is None:
-                    subparsers_group = handler.add_subparsers()
-                if field_name not in subparsers:
-                    subparsers[field_name] = subparsers_group.add_parser(field_name, **subparsers_kwargs)
-                    if subparser_defaults is not None:
-                        subparsers[field_name].set_defaults(**subparser_defaults)
+                if main.subparsers_kwargs is None:
+                    main.subparsers_kwargs = {}
+                if field_name not in main.subparsers:
+                    main.subparsers[field_name] = (attr.kwargs, attr.defaults, _PlanBuilder(None, params.help_formatter))
+                if attr.dataclass is not None:
+                    if "dest" not in main.subparsers_kwargs:
+                        raise ValueError(
+                            "A field defined with the function `subparsers()` is required to store the subparsers "
+                            "defined with the argument `dataclass`"
+                        )
+                    main.subparsers_dataclasses[field_name] = attr.dataclass
 
     for fld in fields(cls):
-        if type(fld.type) == str:
-            fld.type = eval(fld.type)
-        if get_origin(fld.type) is list or (get_origin(fld.type) in [Union, UnionType] and type(None) in get_args(fld.type)):
-            fld.type = [a for a in get_args(fld.type) if a is not type(None)][0]
-        if get_origin(fld.type) is Callable or not callable(fld.type):
-            fld.type = None
-
         if fld.metadata.get("is_subparsers_group", False):
             continue
 
         if fld.metadata.get("is_post_default", False):
-            parser.set_defaults(**{fld.name: fld.default})
+            main.defaults[fld.name] = fld.default
             continue
 
-        argument_kwargs = fld.metadata.get("argument_kwargs", {})
+        name_or_flags, argument_kwargs = _compile_argument(cls, fld, default_bool, params.help_formatter is not None)
+        if "container" in fld.metadata and argument_kwargs.get("type", None) not in _CONTAINER_TYPECODES:
+            raise TypeError(f"The argument `{fld.name}` defined with `container` must be of type `int` or `float`")
 
-        if "help" in argument_kwargs:
-            argument_kwargs["help"] = help_formatter(argument_kwargs["help"])
+        group_id: str | int | None = fld.metadata.get("group_title", None)
+        exclusive_group_id: str | int | None = fld.metadata.get("mutually_exclusive_group_id", None)
 
-        arg_field_has_default = fld.default is not fld.default_factory
-        make_flag = fld.metadata.get("make_flag", True)
-        name_or_flags = fld.metadata.get("name_or_flags", ())
-        if (arg_field_has_default and fld.metadata.get("is_flag", True)) or fld.type == bool:
-            if make_flag or (fld.type == bool and not name_or_flags):
-                name_or_flags += (f'--{fld.name.replace("_", "-")}',)
-            if fld.type == bool and (not arg_field_has_default or fld.default is None):
-                fld.default = default_bool
+        group: Field | int | str | None = fld.metadata.get("group", None)
+        mutually_exclusive_group: Field | int | str | None = fld.metadata.get("mutually_exclusive_group", None)
+        subparser: Field | None = fld.metadata.get("subparser", None)
 
-        if not name_or_flags:  # no flag arg
-            name_or_flags = (fld.name,)
-        else:  # flag arg
-            argument_kwargs["dest"] = fld.name
+        builder = main
+        group_key: str | int | None = None
+        exclusive_group_key: str | int | None = None
+
+        if subparser is not None:
+            if subparser.name in main.subparsers_dataclasses:
+                raise ValueError(
+                    f"The argument `{fld.name}` can not be added to the subparser `{subparser.name}` defined with "
+                    "the argument `dataclass`"
+                )
+            builder = main.subparsers[subparser.name][2]
+
+        # the positionals are parsed even when missing from the command line, so their values can not be preset
+        positional = name_or_flags == (fld.name,)
+        env: str | None = fld.metadata.get("env", None)
+        if env is not None and positional:
+            raise ValueError(f"The argument `{fld.name}` defined with `env` must be a flag, not a positional argument")
+        if env is None and params.env_prefix is not None and builder is main and not positional:
+            env = f"{params.env_prefix}{fld.name.upper()}"
+
+        if group is not None:
+            group_kwargs = {}
+            if type(group) is Field:
+                group_key = group.name
+                group_kwargs = group.metadata.get("argument_group_kwargs", {})
+            if type(group) is str or type(group) is int:
+                group_key = group
+            if type(group) is str:
+                group_kwargs = {"title": group}
+            builder.add_group(cast(str | int, group_key), group_kwargs)
+
+        if group_id is not None:
+            builder.add_group(
+                group_id,
+                dict(
+                    title=group_id if type(group_id) == str else None,
+                    description=groups_descriptions.get(group_id, None),
+                ),
+            )
+            group_key = group_id
+
+        if mutually_exclusive_group is not None:
+            group_kwargs = {}
+            if type(mutually_exclusive_group) is Field:
+                exclusive_group_key = mutually_exclusive_group.name
+                group_kwargs = mutually_exclusive_group.metadata.get("mutually_exclusive_group_kwargs", {})
+            if type(mutually_exclusive_group) is str or type(mutually_exclusive_group) is int:
+                exclusive_group_key = mutually_exclusive_group
+            builder.add_mutually_exclusive_group(cast(str | int, exclusive_group_key), group_kwargs, group_key, None)
+
+        if exclusive_group_id is not None:
+            builder.add_mutually_exclusive_group(
+                exclusive_group_id,
+                dict(required=required_groups_status.get(exclusive_group_id, False)),
+                group_key,
+                exclusive_group_key,
+            )
+            exclusive_group_key = exclusive_group_id
+
+        builder.arguments.append(
+            ArgumentSpec(
+                fld.name,
+                name_or_flags,
+                tuple(argument_kwargs.items()),
+                group_key,
+                exclusive_group_key,
+                fld.metadata.get("concurrent", None),
+                fld.metadata.get("container", None),
+                env,
+            )
+        )
 
-        if "type" not in argument_kwargs and fld.type != bool:
-            argument_kwargs["type"] = fld.type
+    return main.build()
 
-        if "action" not in argument_kwargs and fld.type == bool:
-            argument_kwargs["action"] = "store_false" if fld.default else "store_true"
 
-        if fld.type == bool:
-            fld.default = argument_kwargs["action"] == "store_false"
+_plans: "weakref.WeakKeyDictionary[type, ParserPlan]" = weakref.WeakKeyDictionary()
+_plans_lock = threading.RLock()
 
-        if argument_kwargs.get("action", None) in ["store_const", "store_true", "store_false", "help"]:
-            argument_kwargs.pop("type", None)
 
-        group_id: str | int | None = fld.metadata.get("group_title", None)
-        exclusive_group_id: str | int | None = fld.metadata.get("mutually_exclusive_group_id", None)
+_PLAN_CACHE_FORMAT = 4
 
-        group: Field | int | str | None = fld.metadata.get("group", None)
-        mutually_exclusive_group: Field | int | str | None = fld.metadata.get("mutually_exclusive_group", None)
-        subparser: Field | None = fld.metadata.get("subparser", None)
-        if any(id is not None for id in [group_id, exclusive_group_id, group, mutually_exclusive_group, subparser]):
 
-            handler = parser
+def _default_cache_dir() -> str:
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "dataparsers")
 
-            if subparser is not None:
-                handler = subparsers[subparser.name]
 
-            if group is not None:
-                group_kwargs = {}
-                if type(group) is Field:
-                    group_name = group.name
-                    group_kwargs = group.metadata.get("argument_group_kwargs", {})
-                if type(group) is str or type(group) is int:
-                    group_name = group
-                if type(group) is str:
-                    group_kwargs = {"title": group}
-                if group_name not in groups:
-                    groups[group_name] = handler.add_argument_group(**group_kwargs)
+def _plan_cache_path(cls: type, cache_dir: str | os.PathLike[str]) -> str:
+    import hashlib
 
-                handler = groups[group_name]
+    name = hashlib.sha256(f"{cls.__module__}:{cls.__qualname__}".encode()).hexdigest()[:32]
+    return os.path.join(cache_dir, f"{name}.pickle")
 
-            if group_id is not None:
-                if group_id not in groups:
-                    groups[group_id] = parser.add_argument_group(
-                        title=group_id if type(group_id) == str else None,
-                        description=groups_descriptions.get(group_id, None),
-                    )
 
-                handler = groups[group_id]
+def _class_values_digest(cls: type) -> str | None:
+    """Returns a hash of the values of the class used to compile the plan (defaults, metadata of the fields, subparsers
+    and parameters of `dataparser()`), which may be computed at run time (e.g. from environment variables), or `None`
+    if they can not be pickled."""
+    import hashlib
 
-            if mutually_exclusive_group is not None:
-                group_kwargs = {}
-                if type(mutually_exclusive_group) is Field:
-                    group_name = mutually_exclusive_group.name
-                    group_kwargs = mutually_exclusive_group.metadata.get("mutually_exclusive_group_kwargs", {})
-                if type(mutually_exclusive_group) is str or type(mutually_exclusive_group) is int:
-                    group_name = mutually_exclusive_group
-                if group_name not in mutually_exclusive_groups:
-                    mutually_exclusive_groups[group_name] = handler.add_mutually_exclusive_group(**group_kwargs)
+    dataclass_fields = getattr(cls, "__dataclass_fields__", {}).values()
+    values = (
+        [
+            (f.name, f.default, {k: v.name if isinstance(v, Field) else v for k, v in f.metadata.items()})
+            for f in dataclass_fields
+            if f._field_type is not _FIELD_CLASSVAR
+        ],
+        [getattr(cls, f.name, None) for f in dataclass_fields if f._field_type is _FIELD_CLASSVAR],
+        _get_params(cls),
+    )
+    try:
+        return hashlib.sha256(pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+    except Exception:  # objects that can not be pickled (e.g. lambdas)
+        return None
+
+
+def _plan_fingerprint(cls: type) -> tuple[Any, ...] | None:
+    module_file = getattr(sys.modules.get(cls.__module__), "__file__", None)
+    if module_file is None or "<locals>" in cls.__qualname__:
+        return None
+    try:
+        module_stat = os.stat(module_file)
+        this_stat = os.stat(__file__)
+    except OSError:
+        return None
+    digest = _class_values_digest(cls)
+    if digest is None:
+        return None
+    return (
+        _PLAN_CACHE_FORMAT,
+        sys.implementation.cache_tag,
+        this_stat.st_mtime_ns,
+        this_stat.st_size,
+        cls.__module__,
+        cls.__qualname__,
+        os.path.abspath(module_file),
+        module_stat.st_mtime_ns,
+        module_stat.st_size,
+        digest,
+    )
 
-                handler = mutually_exclusive_groups[group_name]
 
-            if exclusive_group_id is not None:
+def _load_cache_file(path: str, fingerprint: tuple[Any, ...]) -> Any:
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+        cached_fingerprint, value = pickle.loads(data)
+    except Exception:  # missing, corrupted or outdated cache file
+        return None
+    return value if cached_fingerprint == fingerprint else None
+
+
+def _load_plan(path: str, fingerprint: tuple[Any, ...]) -> ParserPlan | None:
+    plan = _load_cache_file(path, fingerprint)
+    return plan if isinstance(plan, ParserPlan) else None
+
+
+def _store_cache_file(path: str, fingerprint: tuple[Any, ...], value: Any) -> None:
+    try:
+        data = pickle.dumps((fingerprint, value), protocol=pickle.HIGHEST_PROTOCOL)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(data)
+        os.replace(temporary_path, path)
+    except Exception:  # objects that can not be pickled (e.g. lambdas) or read-only cache directory
+        pass
+
+
+def _compile_plan_with_disk_cache(cls: type) -> ParserPlan:
+    disk_cache = _get_params(cls).disk_cache
+    if disk_cache is False:
+        return _compile_plan(cls)
+    fingerprint = _plan_fingerprint(cls)
+    if fingerprint is None:
+        return _compile_plan(cls)
+    path = _plan_cache_path(cls, _default_cache_dir() if disk_cache is True else disk_cache)
+    plan = _load_plan(path, fingerprint)
+    if plan is None:
+        plan = _compile_plan(cls)
+        _store_cache_file(path, fingerprint, plan)
+    return plan
+
+
+def make_plan(cls: type) -> ParserPlan:
+    with _plans_lock:
+        plan = _plans.get(cls)
+        if plan is None:
+            plan = _plans[cls] = _compile_plan_with_disk_cache(cls)
+        return plan
 
-                if exclusive_group_id not in mutually_exclusive_groups:
-                    mutually_exclusive_groups[exclusive_group_id] = handler.add_mutually_exclusive_group(
-                        required=required_groups_status.get(exclusive_group_id, False),
-                    )
 
-                handler = mutually_exclusive_groups[exclusive_group_id]
+def make_parser(cls: type, *, parser: ArgumentParser | None = None) -> ArgumentParser:
+    return make_plan(cls).materialize(parser)
 
-            handler.add_argument(*name_or_flags, default=fld.default, **argument_kwargs)
 
-        else:
-            parser.add_argument(*name_or_flags, default=fld.default, **argument_kwargs)
+# %% ################################################ config files region ######################################################
 
-    return parser
+_CONFIG_FORMATS = {".toml": "toml", ".json": "json", ".ini": "ini", ".cfg": "ini"}
+_BOOLEAN_STATES = {"1": True, "yes": True, "true": True, "on": True, "0": False, "no": False, "false": False, "off": False}
+_config_files: dict[tuple[str, str | None], tuple[tuple[int, int], dict[str, Any]]] = {}
+_config_values: "weakref.WeakKeyDictionary[type, tuple[tuple[Any, ...], dict[str, tuple[Any, str]]]]" = (
+    weakref.WeakKeyDictionary()
+)
+_config_lock = threading.Lock()
+
+
+def _config_file_format(path: str) -> str:
+    config_format = _CONFIG_FORMATS.get(os.path.splitext(path)[1].lower())
+    if config_format is None:
+        raise ValueError(f"Unknown format of the config file {path!r}, expected one of {', '.join(_CONFIG_FORMATS)}")
+    if config_format == "toml" and sys.version_info < (3, 11) and importlib.util.find_spec("tomli") is None:
+        raise ImportError(f"The TOML config file {path!r} requires Python 3.11 or `tomli` to be installed")
+    return config_format
 
 
-def parse(cls: type[Class], args: Sequence[str] | None = None, *, parser: ArgumentParser | None = None) -> Class:
-    return cls(**vars(make_parser(cls, parser=parser).parse_args(args)))
+def _read_config_file(path: str, section: str | None) -> dict[str, Any]:
+    config_format = _config_file_format(path)
+    if config_format == "ini":
+        import configparser
+
+        config = configparser.ConfigParser(interpolation=None)
+        with open(path, encoding="utf-8") as file:
+            config.read_file(file)
+        if section is None:
+            return dict(config.defaults())
+        return dict(config[section]) if config.has_section(section) else {}
+
+    if config_format == "toml":
+        if sys.version_info >= (3, 11):
+            import tomllib
+        else:
+            import tomli as tomllib
+
+        with open(path, "rb") as file:
+            data = tomllib.load(file)
+    else:
+        import json
+
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+    for key in section.split(".") if section is not None else ():
+        data = data.get(key, {}) if isinstance(data, dict) else data
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a table of options{'' if section is None else f' in {section!r}'}")
+    return data
+
+
+def _load_config_file(path: str, stat: os.stat_result, section: str | None, cache_dir: str | None) -> dict[str, Any]:
+    """Loads a config file, cached in this process and, with a `cache_dir`, on disk, while the file is not modified."""
+    fingerprint = (stat.st_mtime_ns, stat.st_size)
+    cached = _config_files.get((path, section))
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    data = None
+    if cache_dir is not None:
+        import hashlib
+
+        name = hashlib.sha256(f"{path}:{section}".encode()).hexdigest()[:32]
+        cache_path = os.path.join(cache_dir, f"config-{name}.pickle")
+        cache_fingerprint = (_PLAN_CACHE_FORMAT, path, section, *fingerprint)
+        data = _load_cache_file(cache_path, cache_fingerprint)
+    if not isinstance(data, dict):
+        data = _read_config_file(path, section)
+        if cache_dir is not None:
+            _store_cache_file(cache_path, cache_fingerprint, data)
+    with _config_lock:
+        _config_files[(path, section)] = (fingerprint, data)
+    return data
+
+
+def _config_value(parser: ArgumentParser, action: Action, value: Any) -> Any:
+    if type(action) in (_StoreTrueAction, _StoreFalseAction) and isinstance(value, str):
+        if value.lower() not in _BOOLEAN_STATES:
+            raise ArgumentError(action, _("invalid boolean value: %r") % value)
+        return _BOOLEAN_STATES[value.lower()]
+    if isinstance(value, str) and (
+        action.nargs in [ZERO_OR_MORE, ONE_OR_MORE] or type(action.nargs) is int or type(action) is _ExtendAction
+    ):
+        value = split_command(value)
+    if isinstance(value, list):
+        converted = None
+        if (
+            isinstance(parser, _ArgumentParser)
+            and action.choices is None
+            and _pending_values.get() is None  # the awaitables of `parse_async()` are wrapped by `_get_value()`
+            and all(isinstance(item, str) for item in value)
+        ):
+            converted = parser._convert_list(action, value)
+        if converted is None:
+            converted = [parser._get_value(action, item) if isinstance(item, str) else item for item in value]
+            for item in converted:
+                parser._check_value(action, item)
+        value = converted
+        container = getattr(action, "_container", None)
+        return value if container is None else _make_container(container, action.type, value)
+    if isinstance(value, str):
+        value = parser._get_value(action, value)
+    parser._check_value(action, value)
+    return value
+
+
+def _load_config_values(cls: type, params: "_DataParserParams", parser: ArgumentParser) -> dict[str, tuple[Any, str]]:
+    """Returns the values of the config files (not converted, since the values are converted on each parse) and the
+    path of the file of each value, cached while the files are not modified."""
+    files = []
+    for path in params.config_files:
+        path = os.path.abspath(path)
+        try:
+            files.append((path, os.stat(path)))
+        except FileNotFoundError:
+            continue
+    key = tuple((path, stat.st_mtime_ns, stat.st_size) for path, stat in files)
+    cached = _config_values.get(cls)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    disk_cache = params.disk_cache
+    cache_dir = None if disk_cache is False else _default_cache_dir() if disk_cache is True else os.fspath(disk_cache)
+    actions = {action.dest: action for action in parser._actions if action.dest is not SUPPRESS}
+    # the sub-commands parse into new namespaces with their own defaults, so their arguments can not be preset
+    subcommands = {argument.dest: spec.name for spec in make_plan(cls).subparsers for argument in spec.plan.arguments}
+    values: dict[str, tuple[Any, str]] = {}
+    for path, stat in files:  # the last files have precedence
+        try:
+            data = _load_config_file(path, stat, params.config_section, cache_dir)
+        except Exception as error:
+            parser.error(_("invalid config file %(path)r: %(error)s") % dict(path=path, error=error))
+        for name, value in data.items():
+            dest = name.replace("-", "_")
+            if dest in subcommands and dest not in actions:
+                parser.error(
+                    _("option %(name)r of the sub-command %(command)r can not be set in config file %(path)r")
+                    % dict(name=name, command=subcommands[dest], path=path)
+                )
+            if dest not in actions and dest not in parser._defaults:
+                if isinstance(value, dict):  # a table of other options, e.g. another section
+                    continue
+                parser.error(_("unknown option %(name)r in config file %(path)r") % dict(name=name, path=path))
+            values[dest] = (value, path)
+    with _config_lock:
+        _config_values[cls] = (key, values)
+    return values
+
+
+def _config_file_values(parser: ArgumentParser, config_values: dict[str, tuple[Any, str]]) -> dict[str, Any]:
+    actions = {action.dest: action for action in parser._actions if action.dest is not SUPPRESS}
+    values: dict[str, Any] = {}
+    for dest, (value, path) in config_values.items():
+        if dest not in actions:  # the lists are copied, so changes in parsed instances do not change the cached values
+            values[dest] = value[:] if type(value) is list else value
+            continue
+        try:
+            values[dest] = _config_value(parser, actions[dest], value)
+        except ArgumentError as error:
+            _preset_error(parser, error, f"config file {path!r}")
+    return values
+
+
+def _preset_error(parser: ArgumentParser, error: ArgumentError, origin: str) -> NoReturn:
+    error.message = f"{error.message} (in {origin})"
+    if not isinstance(parser, _ArgumentParser):
+        parser.error(str(error))
+    parser._argument_error(error, getattr(error, "token", None))
+
+
+def _preset_values(
+    cls: type,
+    parser: ArgumentParser,
+    raise_errors: bool,
+    environment: "_Environment | None" = None,
+) -> dict[str, Any] | None:
+    """Returns the values set before parsing the arguments (from config files and environment variables), which have
+    precedence over the defaults, or `None` if there are no such values."""
+    params = _get_params(cls)
+    if environment is None:
+        environment = _environment(make_plan(cls), parser)
+    if not params.config_files and not environment:
+        return None
+    token = _raise_parse_errors.set(raise_errors)
+    try:
+        values = _config_file_values(parser, _load_config_values(cls, params, parser)) if params.config_files else {}
+        if environment:
+            values.update(_environment_values(parser, environment))
+    finally:
+        _raise_parse_errors.reset(token)
+    return values or None
+
+
+# %% ############################################ environment variables region #################################################
+
+# the name of the variable and the action of the argument
+_Environment = tuple[tuple[str, Action], ...]
+
+
+def _environment(plan: ParserPlan, parser: ArgumentParser) -> _Environment:
+    """Returns the environment variables read by the arguments of the parser."""
+    arguments = [argument for argument in plan.arguments if argument.env is not None]
+    if not arguments:
+        return ()
+    actions = {action.dest: action for action in parser._actions}
+    return tuple((argument.env, actions[argument.dest]) for argument in arguments)
+
+
+def _environment_values(parser: ArgumentParser, environment: _Environment) -> dict[str, Any]:
+    values: dict[str, Any] = {}
+    for name, action in environment:
+        value = os.environ.get(name)
+        if not value:  # unset or empty variables are ignored
+            continue
+        try:
+            values[action.dest] = _config_value(parser, action, value)
+        except ArgumentError as error:
+            _preset_error(parser, error, f"environment variable {name}")
+    return values
+
+
+# %% ############################################## command splitter region ####################################################
+
+# characters that need the full lexer: quotes, backslashes and whitespace that `str.split()` splits but the shell does not
+_SPLIT_SPECIAL = re.compile(r"[\\'\"\x0b\x0c\x1c-\x1f]")
+_SPLIT_TOKENS = re.compile(
+    r"""
+    (?P<space>[ \t\r\n]+)
+    | (?P<word>[^ \t\r\n\\'"]+)
+    | \\(?P<escaped>.)
+    | '(?P<single>[^']*)'
+    | "(?P<double>(?:[^"\\]|\\.)*)"
+    | (?P<error>.)
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+_DOUBLE_QUOTED_ESCAPES = re.compile(r'\\(["\\])')
+_DOUBLE_QUOTED_END_ESCAPED = re.compile(r"(?:[^\\]|\\.)*\\", re.DOTALL)  # unclosed quote ending in a backslash
+
+
+def split_command(command: str) -> list[str]:
+    if command.isascii() and _SPLIT_SPECIAL.search(command) is None:
+        return command.split()
+    words: list[str] = []
+    parts: list[str] = []
+    in_word = False
+    for match in _SPLIT_TOKENS.finditer(command):
+        kind = match.lastgroup
+        if kind == "space":
+            if in_word:
+                words.append("".join(parts))
+                parts.clear()
+                in_word = False
+            continue
+        if kind == "error":
+            escaped = match.group() == "\\" or (
+                match.group() == '"' and _DOUBLE_QUOTED_END_ESCAPED.fullmatch(command, match.end()) is not None
+            )
+            raise ValueError("No escaped character" if escaped else "No closing quotation")
+        text = match.group(kind)
+        parts.append(_DOUBLE_QUOTED_ESCAPES.sub(r"\1", text) if kind == "double" and "\\" in text else text)
+        in_word = True
+    if in_word:
+        words.append("".join(parts))
+    return words
+
+
+# %% ################################################ parse errors region ######################################################
+
+_raise_parse_errors: ContextVar[bool] = ContextVar("_raise_parse_errors", default=False)
+
+
+class ParseError(Exception):
+    def __init__(
+        self, reason: str, argument: str | None = None, token: str | None = None, parser: ArgumentParser | None = None
+    ):
+        super().__init__(reason, argument, token)
+        self.reason = reason
+        self.argument = argument
+        self.token = token
+        self.parser = parser
+        self.line: int | None = None
+        self._usage: str | None = None
+
+    def __str__(self) -> str:
+        message = self.reason if self.argument is None else f"argument {self.argument}: {self.reason}"
+        return message if self.line is None else f"line {self.line}: {message}"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # the parser is not sent to other processes, only its usage message
+        return _restore_parse_error, (self.reason, self.argument, self.token, self.usage, self.line)
+
+    @property
+    def usage(self) -> str:
+        if self._usage is None:
+            self._usage = "" if self.parser is None else self.parser.format_usage()
+        return self._usage
+
+
+def _restore_parse_error(
+    reason: str, argument: str | None, token: str | None, usage: str, line: int | None = None
+) -> ParseError:
+    error = ParseError(reason, argument, token)
+    error._usage = usage
+    error.line = line
+    return error
+
+
+class _ArgumentParser(ArgumentParser):
+    """Parser created by `dataparsers`, which raises `ParseError` instead of exiting when `_raise_parse_errors` is set.
+
+    The errors are raised before `argparse` formats the usage message, so invalid input costs only the error reason.
+    """
+
+    def parse_args(self, args=None, namespace=None):
+        if not _raise_parse_errors.get():
+            return super().parse_args(args, namespace)
+        namespace, extras = self.parse_known_args(args, namespace)
+        if extras:
+            raise ParseError(_("unrecognized arguments: %s") % " ".join(extras), token=extras[0], parser=self)
+        return namespace
+
+    def _read_args_from_files(self, arg_strings):
+        if "convert_arg_line_to_args" in vars(self) or type(self).convert_arg_line_to_args is not (
+            ArgumentParser.convert_arg_line_to_args
+        ):
+            return super()._read_args_from_files(arg_strings)
+        prefixes = tuple(self.fromfile_prefix_chars)
+        new_arg_strings = []
+        for arg_string in arg_strings:
+            if not arg_string.startswith(prefixes):
+                new_arg_strings.append(arg_string)
+                continue
+            try:
+                for file_arg_strings in _read_args_file(arg_string[1:]):
+                    if any(map(str.startswith, file_arg_strings, repeat(prefixes))):
+                        file_arg_strings = self._read_args_from_files(file_arg_strings)
+                    new_arg_strings.extend(file_arg_strings)
+            except (OSError, EOFError) as error:
+                self.error(str(error))
+        return new_arg_strings
+
+    def _parse_known_args(self, *args, **kwargs):
+        try:
+            return super()._parse_known_args(*args, **kwargs)
+        except ArgumentError as error:
+            if not _raise_parse_errors.get():
+                raise
+            raise ParseError(error.message, error.argument_name, getattr(error, "token", None), self) from None
+
+    def _get_values(self, action, arg_strings):
+        container = getattr(action, "_container", None)
+        if container is not None and action.nargs not in [None, OPTIONAL, PARSER]:
+            return self._get_container(action, arg_strings, container)
+        if (
+            len(arg_strings) > 1
+            and action.choices is None
+            and (action.nargs in [ZERO_OR_MORE, ONE_OR_MORE] or type(action.nargs) is int)
+            and getattr(action, "_concurrent", None) is None
+            and _pending_values.get() is None
+            and "--" not in arg_strings
+        ):
+            values = self._convert_list(action, arg_strings)
+            if values is not None:
+                return values
+        converted_values = None
+        concurrent = getattr(action, "_concurrent", None)
+        if concurrent is not None and len(arg_strings) > 1 and action.nargs != PARSER:
+            converted_values = _converted_values.set(_convert_concurrently(self, action, arg_strings, concurrent))
+        try:
+            return super()._get_values(action, arg_strings)
+        except ArgumentError as error:
+            if getattr(error, "token", None) is None and (len(arg_strings) == 1 or action.nargs == PARSER):
+                error.token = arg_strings[0]
+            raise
+        finally:
+            if converted_values is not None:
+                _converted_values.reset(converted_values)
+
+    def _convert_list(self, action, arg_strings):
+        # converts long lists (e.g. read from argument files) without calling `_get_value()` for each string
+        type_func = self._registry_get("type", action.type, action.type)
+        if not callable(type_func) or isinstance(type_func, FileType):
+            return None
+        values: list[Any] = []
+        try:
+            values.extend(map(type_func, arg_strings))  # keeps the values converted before an error
+        except (ArgumentTypeError, TypeError, ValueError):
+            # only the invalid string is converted again, by `argparse`, which raises its error
+            values.extend(self._get_value(action, arg_string) for arg_string in arg_strings[len(values) :])
+        return values
+
+    def _get_container(self, action, arg_strings, container):
+        raw_values = _raw_values.set(action.choices is None)  # the choices are checked with the converted values
+        try:
+            values = super()._get_values(action, arg_strings)
+        finally:
+            _raw_values.reset(raw_values)
+        if type(values) is not list:  # the default of a positional without arguments
+            return values
+        try:
+            return _make_container(container, action.type, values)
+        except (TypeError, ValueError, OverflowError):
+            pass
+        for arg_string in values:  # the first invalid string raises the same error of `argparse`
+            value = self._get_value(action, arg_string)
+            try:
+                _make_container(container, action.type, [value])
+            except (TypeError, ValueError, OverflowError):
+                name = getattr(action.type, "__name__", repr(action.type))
+                error = ArgumentError(action, _("invalid %(type)s value: %(value)r") % dict(type=name, value=arg_string))
+                error.token = arg_string
+                raise error
+        raise ArgumentError(action, _("invalid values: %r") % values)
+
+    def _get_value(self, action, arg_string):
+        if _raw_values.get():
+            return arg_string
+        converted_values = _converted_values.get()
+        if converted_values is not None and converted_values.get(arg_string):
+            value = converted_values[arg_string].popleft()
+        else:
+            try:
+                value = super()._get_value(action, arg_string)
+            except ArgumentError as error:
+                error.token = arg_string
+                raise
+        pending_values = _pending_values.get()
+        if pending_values is not None and inspect.isawaitable(value):
+            value = _PendingValue(value, action, arg_string, self)
+            pending_values.append(value)
+        return value
+
+    def _check_value(self, action, value):
+        if isinstance(value, _PendingValue):
+            value.check_choices = True  # checked by `parse_async()`, after the value is awaited
+            return
+        super()._check_value(action, value)
+
+    def _argument_error(self, error: ArgumentError, token: str | None) -> NoReturn:
+        if _raise_parse_errors.get():
+            raise ParseError(error.message, error.argument_name, token, self)
+        self.error(str(error))
+
+    def error(self, message):
+        if _raise_parse_errors.get():
+            raise ParseError(message, parser=self)
+        super().error(message)
+
+
+def _parse_args(
+    parser: ArgumentParser,
+    args: Sequence[str] | None,
+    raise_errors: bool,
+    known: bool = False,
+    preset: dict[str, Any] | None = None,
+) -> Any:
+    namespace = None if preset is None else Namespace(**preset)
+    if not raise_errors:
+        return parser.parse_known_args(args, namespace) if known else parser.parse_args(args, namespace)
+    if not isinstance(parser, _ArgumentParser):
+        raise ValueError("The option `raise_errors` can only be used with parsers created by `make_parser()`")
+    token = _raise_parse_errors.set(True)
+    try:
+        return parser.parse_known_args(args, namespace) if known else parser.parse_args(args, namespace)
+    finally:
+        _raise_parse_errors.reset(token)
+
+
+# %% ############################################### argument files region #####################################################
+
+_ARGS_FILE_CHUNK_SIZE = 1 << 20
+
+
+def _split_args(data: "bytes | mmap.mmap") -> Iterator[list[str]]:
+    """Splits the arguments of the contents of an argument file in chunks ending at a separator (NUL, if the contents
+    have any NUL character, or a line break), yielding the arguments of each chunk. The chunks are decoded from a
+    `memoryview`, so a memory-mapped file is never copied to `bytes`."""
+    encoding, errors = sys.getfilesystemencoding(), sys.getfilesystemencodeerrors()
+    separator = b"\0" if data.find(b"\0") != -1 else b"\n"
+    size = len(data)
+    start = 0
+    with memoryview(data) as view:
+        while start < size:
+            end = data.rfind(separator, start, start + _ARGS_FILE_CHUNK_SIZE) + 1
+            if not end:  # an argument longer than the chunk
+                end = data.find(separator, start + _ARGS_FILE_CHUNK_SIZE) + 1 or size
+            text = str(view[start:end], encoding, errors)
+            start = end
+            if separator == b"\n":
+                yield text.splitlines()
+                continue
+            args = text.split("\0")
+            if not args[-1]:  # the separator ending the chunk
+                args.pop()
+            yield args
+
+
+def _read_args_file(path: str) -> Iterator[list[str]]:
+    """Reads the arguments of an argument file (one per line, like `argparse`), chunk by chunk, yielding the arguments
+    of each chunk. Files containing NUL characters have NUL separated arguments and gzip files are decompressed."""
+    with open(path, "rb") as file:
+        if file.peek(2)[:2] == b"\x1f\x8b":
+            import gzip
+
+            with gzip.GzipFile(fileobj=file) as gzip_file:
+                yield from _split_args(gzip_file.read())
+            return
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # empty files, pipes etc.
+            yield from _split_args(file.read())
+            return
+        with data:
+            yield from _split_args(data)
+
+
+# %% #################################################### async region #########################################################
+
+_pending_values: ContextVar[list["_PendingValue"] | None] = ContextVar("_pending_values", default=None)
+
+
+class _PendingValue:
+    """Value returned by an asynchronous type converter, awaited by `parse_async()` after all arguments are parsed."""
+
+    __slots__ = ("awaitable", "action", "arg_string", "parser", "check_choices")
+
+    def __init__(self, awaitable: Awaitable[Any], action: Action, arg_string: str, parser: "_ArgumentParser"):
+        self.awaitable = awaitable
+        self.action = action
+        self.arg_string = arg_string
+        self.parser = parser
+        self.check_choices = False
+
+    def close(self) -> None:
+        if inspect.iscoroutine(self.awaitable):
+            self.awaitable.close()
+
+    def check(self, result: Any) -> None:
+        # same errors of `ArgumentParser._get_value()` and `ArgumentParser._check_value()`
+        try:
+            if isinstance(result, ArgumentTypeError):
+                raise ArgumentError(self.action, str(result))
+            if isinstance(result, (TypeError, ValueError)):
+                name = getattr(self.action.type, "__name__", repr(self.action.type))
+                message = _("invalid %(type)s value: %(value)r") % dict(type=name, value=self.arg_string)
+                raise ArgumentError(self.action, message)
+            if isinstance(result, BaseException):
+                raise result
+            if self.check_choices:
+                self.parser._check_value(self.action, result)
+        except ArgumentError as error:
+            self.parser._argument_error(error, self.arg_string)
+
+
+def _replace_pending_values(value: Any, results: dict[int, Any]) -> Any:
+    if isinstance(value, _PendingValue):
+        return results[id(value)]
+    if type(value) is list:
+        return [_replace_pending_values(item, results) for item in value]
+    return value
+
+
+async def parse_async(
+    cls: type[Class],
+    args: Sequence[str] | str | None = None,
+    *,
+    parser: ArgumentParser | None = None,
+    raise_errors: bool = False,
+) -> Class:
+    if isinstance(args, str):
+        args = split_command(args)
+    parser = _parser_cache.get(cls).parser if parser is None else make_parser(cls, parser=parser)
+    if not isinstance(parser, _ArgumentParser):
+        raise ValueError("Asynchronous type converters can only be used with parsers created by `make_parser()`")
+
+    pending_values: list[_PendingValue] = []
+    token = _pending_values.set(pending_values)
+    try:
+        namespace = _parse_args(parser, args, raise_errors, preset=_preset_values(cls, parser, raise_errors))
+    except BaseException:
+        for pending_value in pending_values:
+            pending_value.close()
+        raise
+    finally:
+        _pending_values.reset(token)
+    if not pending_values:
+        return _new_instance(cls, vars(namespace))
+
+    import asyncio
+
+    results = await asyncio.gather(*(value.awaitable for value in pending_values), return_exceptions=True)
+    raise_parse_errors = _raise_parse_errors.set(raise_errors)
+    try:
+        for pending_value, result in zip(pending_values, results):
+            pending_value.check(result)
+    finally:
+        _raise_parse_errors.reset(raise_parse_errors)
+    results_by_id = {id(value): result for value, result in zip(pending_values, results)}
+    return _new_instance(cls, {key: _replace_pending_values(value, results_by_id) for key, value in vars(namespace).items()})
+
+
+# %% ############################################ concurrent conversion region #################################################
+
+_CONCURRENT_EXECUTORS = ("thread", "process")
+_executors: "dict[str, Executor]" = {}
+_executors_lock = threading.Lock()
+_converted_values: ContextVar[dict[str, deque[Any]] | None] = ContextVar("_converted_values", default=None)
+
+
+def _shared_executor(kind: str) -> "Executor":
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    with _executors_lock:
+        executor = _executors.get(kind)
+        if executor is None:
+            executor = _executors[kind] = ThreadPoolExecutor() if kind == "thread" else ProcessPoolExecutor()
+        return executor
+
+
+def _try_convert(type_func: Callable[[str], Any], arg_string: str) -> tuple[bool, Any]:
+    try:
+        return True, type_func(arg_string)
+    except Exception:
+        return False, None
+
+
+def _convert_concurrently(
+    parser: ArgumentParser, action: Action, arg_strings: list[str], concurrent: "str | Executor"
+) -> dict[str, deque[Any]] | None:
+    """Converts the argument strings in an executor, returning the values of each string in the order of the command
+    line, or `None` if the strings can not be converted in the executor. The values are returned only up to the first
+    failed conversion, so `argparse` converts only the invalid string again, raising its error."""
+    type_func = parser._registry_get("type", action.type, action.type)
+    if not callable(type_func):
+        return None
+    executor = _shared_executor(concurrent) if isinstance(concurrent, str) else concurrent
+    # the strings are sent to the processes in chunks (the threads ignore the `chunksize`)
+    chunksize = max(1, min(1024, len(arg_strings) // (4 * (os.cpu_count() or 1))))
+    try:
+        results = list(executor.map(functools.partial(_try_convert, type_func), arg_strings, chunksize=chunksize))
+    except Exception:  # e.g. converters that can not be sent to other processes
+        return None
+    converted_values: dict[str, deque[Any]] = {}
+    for arg_string, (converted, value) in zip(arg_strings, results):
+        if not converted:
+            break
+        converted_values.setdefault(arg_string, deque()).append(value)
+    return converted_values
+
+
+# %% ############################################## array containers region ####################################################
+
+_CONTAINERS = ("array", "numpy")
+_CONTAINER_TYPECODES: dict[Any, str] = {int: "q", float: "d"}
+_raw_values: ContextVar[bool] = ContextVar("_raw_values", default=False)
+
+
+def _make_container(container: str, type_func: Callable[[Any], Any], values: list[Any]) -> Any:
+    """Converts all values of a numeric argument at once, into an `array.array` or a NumPy array."""
+    typecode = _CONTAINER_TYPECODES[type_func]
+    if container == "numpy":
+        import numpy
+
+        return numpy.asarray(values, dtype=typecode)  # converts the strings in C, without creating Python numbers
+    return array(typecode, map(type_func, values))
+
+
+# %% ################################################# fast parse region #######################################################
+
+_FALLBACK = object()
+_UNSET = object()
+
+
+def _is_specializable(parser: ArgumentParser) -> bool:
+    if type(parser) not in (ArgumentParser, _ArgumentParser):
+        return False
+    if parser.prefix_chars != "-" or parser.fromfile_prefix_chars is not None or parser._mutually_exclusive_groups:
+        return False
+    if parser._has_negative_number_optionals or any(d is SUPPRESS for d in parser._defaults.values()):
+        return False
+    for action in parser._actions:
+        if type(action) is _HelpAction:
+            continue
+        if action.dest is SUPPRESS or action.default is SUPPRESS or not action.dest.isidentifier():
+            return False
+        if type(action) is _StoreAction:
+            if action.nargs is not None or not callable(parser._registry_get("type", action.type, action.type)):
+                return False
+        elif type(action) not in (_StoreConstAction, _StoreTrueAction, _StoreFalseAction) or not action.option_strings:
+            return False
+        if any(not option.startswith("-") for option in action.option_strings):
+            return False
+    return True
+
+
+def _make_fast_parse(
+    parser: ArgumentParser, tuples: bool = False, init_fields: tuple[str, ...] | None = None
+) -> Callable[[type, Sequence[str], dict[str, Any] | None], Any] | None:
+    """Generates a function specialized to parse the arguments of `parser`, for parsers with simple actions only.
+
+    The generated function returns `_FALLBACK` whenever the arguments need something it does not handle (help, errors,
+    abbreviations, negative numbers, `--` etc.), so that the caller parses them again with `argparse`. The values in
+    `preset` (see `_preset_values()`) replace the defaults. With `tuples`, the lists in defaults, constants and preset
+    values are stored as tuples. With `init_fields` (see `_init_fields()`), the instance is created with positional
+    arguments.
+    """
+    if not _is_specializable(parser):
+        return None
+
+    actions = [action for action in parser._actions if type(action) is not _HelpAction]
+    positionals = [action for action in actions if not action.option_strings]
+    options = [action for action in actions if action.option_strings]
+    globals_: dict[str, Any] = {
+        "_FALLBACK": _FALLBACK,
+        "_UNSET": _UNSET,
+        "_errors": (ArgumentTypeError, TypeError, ValueError),
+        "_options": {option: k for k, action in enumerate(options) for option in action.option_strings},
+        "_preset": _as_tuples if tuples else lambda value: value,
+    }
+    for prefix, group in (("p", positionals), ("o", options)):
+        for k, action in enumerate(group):
+            globals_[f"_type_{prefix}{k}"] = parser._registry_get("type", action.type, action.type)
+            globals_[f"_choices_{prefix}{k}"] = action.choices
+            globals_[f"_const_{prefix}{k}"] = _as_tuples(action.const) if tuples else action.const
+            globals_[f"_default_{prefix}{k}"] = _as_tuples(action.default) if tuples else action.default
+
+    def convert(variable: str, action: Action, value: str, indent: str) -> list[str]:
+        lines = [f"{indent}{variable} = _type_{variable}({value})"]
+        if action.choices is not None:
+            lines.append(f"{indent}if {variable} not in _choices_{variable}:")
+            lines.append(f"{indent}    return _FALLBACK")
+        return lines
+
+    lines = ["def __dataparsers_parse__(cls, args, preset=None):"]
+    lines += [f"    p{k} = _UNSET" for k in range(len(positionals))]
+    lines += [f"    o{k} = _UNSET" for k in range(len(options))]
+    lines += [
+        "    consumed = 0",
+        "    i = 0",
+        "    n = len(args)",
+        "    try:",
+        "        while i < n:",
+        "            token = args[i]",
+        "            i += 1",
+        "            if token[:1] != '-':",
+    ]
+    for k, action in enumerate(positionals):
+        lines.append(f"                {'if' if k == 0 else 'elif'} consumed == {k}:")
+        lines += convert(f"p{k}", action, "token", " " * 20)
+    if positionals:
+        lines += ["                else:", "                    return _FALLBACK"]
+    else:
+        lines.append("                return _FALLBACK")
+    lines += [
+        "                consumed += 1",
+        "                continue",
+        "            value = None",
+        "            slot = _options.get(token)",
+        "            if slot is None:",
+        "                option, separator, value = token.partition('=')",
+        "                slot = _options.get(option) if separator else None",
+        "                if slot is None:",
+        "                    return _FALLBACK",
+    ]
+    for k, action in enumerate(options):
+        lines.append(f"            {'if' if k == 0 else 'elif'} slot == {k}:")
+        if type(action) is _StoreAction:
+            lines += [
+                "                if value is None:",
+                "                    if i == n or args[i][:1] == '-':",
+                "                        return _FALLBACK",
+                "                    value = args[i]",
+                "                    i += 1",
+            ]
+            lines += convert(f"o{k}", action, "value", " " * 16)
+        else:
+            lines += [
+                "                if value is not None:",
+                "                    return _FALLBACK",
+                f"                o{k} = _const_o{k}",
+            ]
+    lines += [
+        "    except _errors:",
+        "        return _FALLBACK",
+        f"    if consumed != {len(positionals)}:",
+        "        return _FALLBACK",
+    ]
+    for k, action in enumerate(options):
+        lines.append(f"    if o{k} is _UNSET:")
+        if action.required:
+            lines.append("        return _FALLBACK")
+            continue
+        lines += [
+            f"        if preset is not None and {action.dest!r} in preset:",
+            f"            o{k} = _preset(preset[{action.dest!r}])",
+            "        else:",
+        ]
+        if isinstance(action.default, str):
+            lines += [
+                "            try:",
+                f"                o{k} = _type_o{k}(_default_o{k})",
+                "            except _errors:",
+                "                return _FALLBACK",
+            ]
+        else:
+            lines.append(f"            o{k} = _default_o{k}")
+    arguments = {action.dest: f"p{k}" for k, action in enumerate(positionals)}
+    arguments.update({action.dest: f"o{k}" for k, action in enumerate(options)})
+    for k, (dest, value) in enumerate(parser._defaults.items()):
+        if dest.isidentifier() and all(dest != action.dest for action in actions):
+            globals_[f"_parser_default{k}"] = _as_tuples(value) if tuples else value
+            lines += [
+                f"    d{k} = _parser_default{k}",
+                f"    if preset is not None and {dest!r} in preset:",
+                f"        d{k} = _preset(preset[{dest!r}])",
+            ]
+            arguments[dest] = f"d{k}"
+    if init_fields is not None and arguments.keys() == set(init_fields):
+        lines.append(f"    return cls({', '.join(arguments[name] for name in init_fields)})")
+    else:
+        lines.append(f"    return cls({', '.join(f'{dest}={variable}' for dest, variable in arguments.items())})")
+
+    exec("\n".join(lines), globals_)
+    return globals_["__dataparsers_parse__"]
+
+
+# %% ################################################ table backend region #####################################################
+
+_BACKENDS = ("argparse", "table")
+
+_TABLE_ACTIONS = (
+    _StoreAction,
+    _StoreConstAction,
+    _StoreTrueAction,
+    _StoreFalseAction,
+    _AppendAction,
+    _AppendConstAction,
+    _CountAction,
+    _ExtendAction,
+    _HelpAction,
+    _VersionAction,
+)
+
+_NARGS_RANGE: dict[Any, tuple[int, float]] = {
+    None: (1, 1),
+    OPTIONAL: (0, 1),
+    ZERO_OR_MORE: (0, inf),
+    ONE_OR_MORE: (1, inf),
+    PARSER: (1, inf),
+}
+
+
+def _check_backend(backend: str) -> str:
+    if backend not in _BACKENDS:
+        raise ValueError(f"The `backend` must be one of {', '.join(map(repr, _BACKENDS))}, not {backend!r}")
+    return backend
+
+
+class _Defer(Exception):
+    """Raised by the table backend when the arguments must be parsed by `argparse`."""
+
+
+class _ParserTable:
+    """Table-driven parser for the subset of `argparse` used by `dataparsers`.
+
+    Option strings are looked up in a dict and the arguments are scanned once, from left to right. The positionals are
+    matched against each run of arguments with the same greedy rule of `argparse` regular expressions, computed from the
+    minimum and maximum number of arguments of each positional. Anything outside the supported subset (help, errors,
+    abbreviations, `--`, negative numbers, combined short flags etc.) raises `_Defer`.
+    """
+
+    def __init__(self, parser: ArgumentParser):
+        self.parser = parser
+        self.actions = parser._actions
+        self.options: dict[str, Action] = dict(parser._option_string_actions)
+        self.positionals = [action for action in parser._actions if not action.option_strings]
+        self.defaults = dict(parser._defaults)
+        self.conflicts: dict[Action, list[Action]] = {}
+        for mutex_group in parser._mutually_exclusive_groups:
+            group_actions = mutex_group._group_actions
+            for i, mutex_action in enumerate(group_actions):
+                self.conflicts.setdefault(mutex_action, []).extend(group_actions[:i] + group_actions[i + 1 :])
+        self.required_groups = [group._group_actions for group in parser._mutually_exclusive_groups if group.required]
+        self.types = {action: parser._registry_get("type", action.type, action.type) for action in parser._actions}
+        self.subparsers: dict[str, _ParserTable | None] = {}
+
+    @classmethod
+    def build(cls, parser: ArgumentParser) -> "_ParserTable | None":
+        if parser.prefix_chars != "-" or parser.fromfile_prefix_chars is not None:
+            return None
+        for action in parser._actions:
+            if isinstance(action, _SubParsersAction):
+                if action.option_strings or action is not parser._subparsers._group_actions[0]:
+                    return None
+                continue
+            if type(action) not in _TABLE_ACTIONS or not callable(parser._registry_get("type", action.type, action.type)):
+                return None
+            if getattr(action, "_concurrent", None) is not None or getattr(action, "_container", None) is not None:
+                return None
+            if action.nargs == PARSER or (action.nargs not in _NARGS_RANGE and type(action.nargs) is not int):
+                return None
+            if not all(option.startswith("-") for option in action.option_strings):
+                return None
+        return cls(parser)
+
+    def subparser_table(self, action: _SubParsersAction, name: str) -> "_ParserTable":
+        if name not in self.subparsers:
+            if name not in action._name_parser_map or name in getattr(action, "_dataclasses", {}):
+                raise _Defer
+            self.subparsers[name] = _ParserTable.build(action._name_parser_map[name])
+        table = self.subparsers[name]
+        if table is None:
+            raise _Defer
+        return table
+
+    def convert(self, action: Action, arg_string: str) -> Any:
+        try:
+            return self.types[action](arg_string)
+        except (ArgumentTypeError, TypeError, ValueError):
+            raise _Defer
+
+    def check(self, action: Action, value: Any) -> None:
+        if action.choices is not None and value not in action.choices:
+            raise _Defer
+
+    def get_values(self, action: Action, arg_strings: list[str]) -> Any:
+        # same as `ArgumentParser._get_values()`, for the supported `nargs`
+        if not arg_strings and action.nargs == OPTIONAL:
+            value = action.const if action.option_strings else action.default
+            if isinstance(value, str):
+                value = self.convert(action, value)
+                self.check(action, value)
+        elif not arg_strings and action.nargs == ZERO_OR_MORE and not action.option_strings:
+            value = action.default if action.default is not None else arg_strings
+            self.check(action, value)
+        elif len(arg_strings) == 1 and action.nargs in [None, OPTIONAL]:
+            value = self.convert(action, arg_strings[0])
+            self.check(action, value)
+        elif action.nargs == PARSER:
+            value = [self.convert(action, v) for v in arg_strings]
+            self.check(action, value[0])
+        else:
+            value = [self.convert(action, v) for v in arg_strings]
+            for v in value:
+                self.check(action, v)
+        return value
+
+    def classify(self, arg_string: str) -> tuple[Action, str | None] | None:
+        """Returns `None` for arguments, the action and the explicit argument for options, or raises `_Defer`."""
+        if not arg_string or arg_string[0] != "-":
+            return None
+        action = self.options.get(arg_string)
+        if action is not None:
+            return action, None
+        if len(arg_string) == 1:
+            return None
+        option_string, separator, explicit_arg = arg_string.partition("=")
+        action = self.options.get(option_string) if separator else None
+        if action is None:
+            raise _Defer
+        return action, explicit_arg
+
+    def allocate(self, positionals: list[Action], count: int, final: bool) -> list[int]:
+        # greedy match of the first positionals against `count` arguments, as `_match_arguments_partial()` does
+        ranges = [_NARGS_RANGE.get(action.nargs) or (action.nargs, action.nargs) for action in positionals]
+        minimums = [0]
+        for minimum, _ in ranges:
+            minimums.append(minimums[-1] + minimum)
+        matched = max(i for i in range(len(ranges) + 1) if minimums[i] <= count)
+        counts = []
+        remaining = count
+        for i in range(matched):
+            taken = int(min(ranges[i][1], remaining - (minimums[matched] - minimums[i + 1])))
+            if taken == 0 and not final:
+                raise _Defer  # zero-length matches before options differ between Python versions
+            counts.append(taken)
+            remaining -= taken
+        return counts
+
+    def parse(self, args: Sequence[str], namespace: dict[str, Any]) -> dict[str, Any]:
+        for action in self.actions:
+            if action.dest is not SUPPRESS and action.dest not in namespace and action.default is not SUPPRESS:
+                namespace[action.dest] = action.default
+        for dest, value in self.defaults.items():
+            namespace.setdefault(dest, value)
+
+        seen: set[Action] = set()
+        seen_non_default: set[Action] = set()
+        positionals = list(self.positionals)
+
+        def take_action(action: Action, arg_strings: list[str]) -> None:
+            seen.add(action)
+            values = self.get_values(action, arg_strings)
+            if values is not action.default:
+                seen_non_default.add(action)
+                if any(conflict in seen_non_default for conflict in self.conflicts.get(action, ())):
+                    raise _Defer
+            if values is SUPPRESS:
+                return
+            if isinstance(action, _SubParsersAction):
+                if action.dest is not SUPPRESS:
+                    namespace[action.dest] = values[0]
+                namespace.update(self.subparser_table(action, values[0]).parse(values[1:], {}))
+            elif type(action) is _StoreAction:
+                namespace[action.dest] = values
+            elif type(action) in (_StoreConstAction, _StoreTrueAction, _StoreFalseAction):
+                namespace[action.dest] = action.const
+            elif type(action) in (_AppendAction, _ExtendAction, _AppendConstAction):
+                items = namespace.get(action.dest, None)
+                items = [] if items is None else items[:] if type(items) is list else copy.copy(items)
+                if type(action) is _ExtendAction:
+                    items.extend(values)
+                else:
+                    items.append(action.const if type(action) is _AppendConstAction else values)
+                namespace[action.dest] = items
+            elif type(action) is _CountAction:
+                count = namespace.get(action.dest, None)
+                namespace[action.dest] = (0 if count is None else count) + 1
+            else:  # help and version
+                raise _Defer
+
+        def consume_positionals(start: int, stop: int, final: bool) -> int:
+            counts = self.allocate(positionals, stop - start, final)
+            for action, count in zip(positionals, counts):
+                if action.nargs == PARSER:
+                    if action is not positionals[0]:
+                        raise _Defer
+                    take_action(action, list(args[start:]))
+                    return len(args)
+                take_action(action, list(args[start : start + count]))
+                start += count
+            del positionals[: len(counts)]
+            return start
+
+        n = len(args)
+        i = 0
+        while i < n:
+            option = self.classify(args[i])
+            if option is None:
+                stop = i + 1
+                while stop < n and self.classify_or_stop(args[stop]):
+                    stop += 1
+                consumed = consume_positionals(i, stop, final=stop == n)
+                if consumed < stop:
+                    raise _Defer  # unrecognized arguments
+                i = consumed
+                continue
+
+            action, explicit_arg = option
+            minimum, maximum = _NARGS_RANGE.get(action.nargs) or (action.nargs, action.nargs)
+            if explicit_arg is not None:
+                if maximum == 0 or minimum > 1:
+                    raise _Defer
+                arg_strings = [explicit_arg]
+                i += 1
+            else:
+                stop = i + 1
+                while stop < n and stop - i - 1 < maximum and self.classify_or_stop(args[stop]):
+                    stop += 1
+                if stop - i - 1 < minimum:
+                    raise _Defer
+                arg_strings = list(args[i + 1 : stop])
+                i = stop
+            take_action(action, arg_strings)
+
+        if positionals:
+            consume_positionals(n, n, final=True)
+
+        for action in self.actions:
+            if action not in seen:
+                if action.required:
+                    raise _Defer
+                if (
+                    action.default is not None
+                    and isinstance(action.default, str)
+                    and action.dest in namespace
+                    and action.default is namespace[action.dest]
+                ):
+                    namespace[action.dest] = self.convert(action, action.default)
+
+        for group_actions in self.required_groups:
+            if not any(action in seen_non_default for action in group_actions):
+                raise _Defer
+
+        return namespace
+
+    def classify_or_stop(self, arg_string: str) -> bool:
+        """Returns whether `arg_string` is an argument (not an option), without raising `_Defer`."""
+        try:
+            return self.classify(arg_string) is None
+        except _Defer:
+            return False
+
+
+class _CachedParser:
+    _UNKNOWN = object()
+
+    def __init__(self, parser: ArgumentParser, cls: type):
+        # the class itself is not stored, so the cache keeps only weak references to it
+        self.parser = parser
+        self.tuples = _get_params(cls).tuples
+        self.init_fields = _init_fields(cls)
+        self.environment = _environment(make_plan(cls), parser)
+        self._fast_parse: Any = self._UNKNOWN
+        self._table: Any = self._UNKNOWN
+        self._metavar_parsers: dict[str, ArgumentParser] = {}
+        self.used = False  # set on each hit of the parser cache
+
+    @property
+    def fast_parse(self) -> Callable[[type, Sequence[str], dict[str, Any] | None], Any] | None:
+        if self._fast_parse is self._UNKNOWN:
+            self._fast_parse = _make_fast_parse(self.parser, self.tuples, self.init_fields)
+        return self._fast_parse
+
+    @property
+    def table(self) -> _ParserTable | None:
+        if self._table is self._UNKNOWN:
+            self._table = _ParserTable.build(self.parser)
+        return self._table
+
+    def metavar_parser(self, cls: type, metavar: str) -> ArgumentParser:
+        parser = self._metavar_parsers.get(metavar)
+        if parser is None:
+            parser = _add_remaining_arguments_metavar(make_parser(cls), metavar, make_plan(cls))
+            parser = self._metavar_parsers.setdefault(metavar, parser)
+        return parser
+
+
+# %% ################################################ parser cache region ######################################################
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+class _ParserCache:
+    """Cache of parsers, whose hits are read without the lock (only misses and evictions take it).
+
+    The recently used entries are approximated as in the "clock" algorithm: a hit only marks the entry as used, and the
+    eviction moves the used entries to the end, instead of evicting them. The number of hits is also approximate, since
+    it is incremented without the lock by concurrent threads.
+    """
+
+    def __init__(self, maxsize: int | None = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._parsers: dict[weakref.ref[type], _CachedParser] = {}
+        self._pending_removals: list[weakref.ref[type]] = []
+        self._lock = threading.RLock()
+
+    def get(self, cls: type) -> _CachedParser:
+        entry = self._parsers.get(weakref.ref(cls))
+        if entry is not None:
+            self.hits += 1
+            entry.used = True
+            return entry
+        with self._lock:
+            self._purge()
+            entry = self._parsers.get(weakref.ref(cls))
+            if entry is not None:  # added by another thread
+                self.hits += 1
+                return entry
+            self.misses += 1
+            entry = _CachedParser(make_parser(cls), cls)
+            if self.maxsize != 0:
+                self._parsers[weakref.ref(cls, self._discard)] = entry
+                self._evict()
+            return entry
+
+    def _discard(self, key: weakref.ref[type]) -> None:
+        # called by the garbage collector: the removal is deferred to avoid mutating the dict while it is in use
+        self._pending_removals.append(key)
+
+    def _purge(self) -> None:
+        while self._pending_removals:
+            self._parsers.pop(self._pending_removals.pop(), None)
+
+    def _evict(self) -> None:
+        second_chances = len(self._parsers)
+        while self.maxsize is not None and len(self._parsers) > self.maxsize:
+            key = next(iter(self._parsers))
+            entry = self._parsers.pop(key)
+            if entry.used and second_chances > 0:
+                second_chances -= 1
+                entry.used = False
+                self._parsers[key] = entry
+
+    def resize(self, maxsize: int | None) -> None:
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("The parser cache `maxsize` must be a non negative integer or `None`")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending_removals.clear()
+            self._parsers.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            self._purge()
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._parsers))
+
+
+_parser_cache = _ParserCache()
+
+
+def parser_cache_info() -> CacheInfo:
+    return _parser_cache.info()
+
+
+def clear_parser_cache() -> None:
+    _parser_cache.clear()
+
+
+def set_parser_cache_size(maxsize: int | None) -> None:
+    _parser_cache.resize(maxsize)
+
+
+def parse(
+    cls: type[Class],
+    args: Sequence[str] | str | None = None,
+    *,
+    parser: ArgumentParser | None = None,
+    backend: str | None = None,
+    raise_errors: bool = False,
+) -> Class:
+    backend = _check_backend(backend or _get_params(cls).backend)
+    if isinstance(args, str):
+        args = split_command(args)
+    if parser is not None:
+        parser = make_parser(cls, parser=parser)
+        preset = _preset_values(cls, parser, raise_errors)
+        return _new_instance(cls, vars(_parse_args(parser, args, raise_errors, preset=preset)))
+    args = sys.argv[1:] if args is None else args if isinstance(args, (list, tuple)) else list(args)
+    return _parse_cached(cls, _parser_cache.get(cls), args, backend, raise_errors)
+
+
+def _parse_cached(cls: type[Class], entry: _CachedParser, args: Sequence[str], backend: str, raise_errors: bool) -> Class:
+    preset = _preset_values(cls, entry.parser, raise_errors, entry.environment)
+    if backend == "table":
+        table = entry.table
+        if table is not None:
+            try:
+                return _new_instance(cls, table.parse(args, {} if preset is None else dict(preset)))
+            except _Defer:
+                pass
+    else:
+        fast_parse = entry.fast_parse
+        if fast_parse is not None:
+            result = fast_parse(cls, args, preset)
+            if result is not _FALLBACK:
+                return result
+    return _new_instance(cls, vars(_parse_args(entry.parser, args, raise_errors, preset=preset)))
+
+
+def _parse_batch(
+    cls: type[Class], argvs: list[Sequence[str] | str], backend: str
+) -> list[Class | Exception | SystemExit]:
+    entry = _parser_cache.get(cls)
+    results: list[Class | Exception | SystemExit] = []
+    for argv in argvs:
+        try:
+            results.append(_parse_cached(cls, entry, split_command(argv) if isinstance(argv, str) else argv, backend, True))
+        except (Exception, SystemExit) as error:  # `SystemExit` is raised by actions like `--help` and `--version`
+            results.append(error)
+    return results
+
+
+def parse_many(
+    cls: type[Class], argvs: Iterable[Sequence[str] | str], *, workers: int | None = None, backend: str | None = None
+) -> list[Class | Exception | SystemExit]:
+    if workers is not None and workers < 1:
+        raise ValueError("The number of `workers` must be a positive integer or `None`")
+    backend = _check_backend(backend or _get_params(cls).backend)
+    argvs = [argv if isinstance(argv, (list, tuple, str)) else list(argv) for argv in argvs]
+    if workers is None:
+        return _parse_batch(cls, argvs, backend)
+    chunksize = max(1, min(1024, len(argvs) // (4 * workers)))
+    chunks = [argvs[i : i + chunksize] for i in range(0, len(argvs), chunksize)]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(workers) as executor:
+        return [result for results in executor.map(_parse_batch, repeat(cls), chunks, repeat(backend)) for result in results]
+
+
+def _read_records(file: IO[str], separator: str) -> Iterator[str]:
+    if separator == "\n":
+        yield from file
+        return
+    pending = ""
+    while chunk := file.read(65536):
+        *records, pending = (pending + chunk).split(separator)
+        yield from records
+    if pending:
+        yield pending
+
+
+def parse_stream(
+    cls: type[Class],
+    file: IO[str] | None = None,
+    *,
+    separator: str = "\n",
+    backend: str | None = None,
+    raise_errors: bool = False,
+) -> Iterator[Class]:
+    if not separator:
+        raise ValueError("The `separator` of the command lines can not be empty")
+    backend = _check_backend(backend or _get_params(cls).backend)
+    entry = _parser_cache.get(cls)
+    for line, record in enumerate(_read_records(sys.stdin if file is None else file, separator), start=1):
+        try:
+            try:
+                args = split_command(record)
+            except ValueError as error:
+                raise ParseError(_("invalid command line: %s") % error, parser=entry.parser) from None
+            if not args:  # blank line
+                continue
+            result = _parse_cached(cls, entry, args, backend, True)
+        except ParseError as error:
+            error.line = line
+            if raise_errors:
+                raise
+            (error.parser or entry.parser).error(str(error))
+        yield result
+
+
+def _add_remaining_arguments_metavar(parser: ArgumentParser, metavar: str, plan: ParserPlan) -> ArgumentParser:
+    parser.usage = f"{parser.format_usage().strip().replace('usage: ','')} [{metavar}]\n"
+    if parser.epilog is None:
+        parser.epilog = ""
+    parser.formatter_class = RawTextHelpFormatter
+    if plan.help_formatter is not None:
+        parser.formatter_class = _deferred_help_formatter_class(RawTextHelpFormatter, plan.help_formatter)
+    parser.epilog = _(f"  {metavar.ljust(19)}Extra remaining unknown arguments.") + parser.epilog
+    return parser
 
 
 def parse_known(
-    cls: type[Class], args: Sequence[str] | None = None, *, parser: ArgumentParser | None = None, metavar: str | None = None
+    cls: type[Class],
+    args: Sequence[str] | str | None = None,
+    *,
+    parser: ArgumentParser | None = None,
+    metavar: str | None = None,
+    raise_errors: bool = False,
 ) -> tuple[Class, list[str]]:
-    parser = make_parser(cls, parser=parser)
-    if metavar is not None:
-        parser.usage = f"{parser.format_usage().strip().replace('usage: ','')} [{metavar}]\n"
-        if parser.epilog is None:
-            parser.epilog = ""
-        parser.formatter_class = RawTextHelpFormatter
-        parser.epilog = _(f"  {metavar.ljust(19)}Extra remaining unknown arguments.") + parser.epilog
-    arguments, remaining_arguments = parser.parse_known_args(args)
-    return cls(**vars(arguments)), remaining_arguments
+    if isinstance(args, str):
+        args = split_command(args)
+    if parser is None:
+        entry = _parser_cache.get(cls)
+        parser = entry.parser if metavar is None else entry.metavar_parser(cls, metavar)
+    else:
+        parser = make_parser(cls, parser=parser)
+        if metavar is not None:
+            _add_remaining_arguments_metavar(parser, metavar, make_plan(cls))
+    preset = _preset_values(cls, parser, raise_errors)
+    arguments, remaining_arguments = _parse_args(parser, args, raise_errors, known=True, preset=preset)
+    return _new_instance(cls, vars(arguments)), remaining_arguments
 
 
 def write_help(
@@ -324,4 +2320,397 @@ def write_help(
     return "\n".join(lines) + ("\n\n" if final_newlines else "")
 
 
+# %% ############################################## shell completion region ####################################################
+
+_COMPLETION_SHELLS = ("bash", "zsh", "fish")
+
+
+class _CompletionOption(NamedTuple):
+    option_strings: tuple[str, ...]
+    nargs: int  # the number of values, or -1 for all values up to the next option
+    values: tuple[str, ...]
+    files: bool
+    help: str | None
+
+
+class _CompletionCommand(NamedTuple):
+    path: str  # the names of the sub-commands, separated by spaces
+    options: tuple[_CompletionOption, ...]
+    positionals: tuple[tuple[tuple[str, ...], bool], ...]  # the values and whether to complete files, by position
+    repeat: bool  # whether the last position takes all the remaining values
+    subparsers: _SubParsersAction | None  # the sub-commands come after the positionals
+    commands: dict[str, tuple[str, str | None]]  # the name (or alias) of each sub-command -> the name and the help
+
+
+def _completion_nargs(nargs: Any) -> int:
+    if nargs is None or nargs == OPTIONAL:
+        return 1
+    return nargs if type(nargs) is int else -1
+
+
+def _completion_values(action: Action) -> tuple[tuple[str, ...], bool]:
+    values = () if action.choices is None else tuple(map(str, action.choices))
+    pathlib = sys.modules.get("pathlib")  # a `Path` type can only be used if `pathlib` was already imported
+    is_path = pathlib is not None and isinstance(action.type, type) and issubclass(action.type, pathlib.PurePath)
+    files = is_path or isinstance(action.type, FileType)
+    return values, files
+
+
+def _completion_help(help: str | None) -> str | None:
+    return None if help is None or help is SUPPRESS else " ".join(help.split())
+
+
+def _completion_command(parser: ArgumentParser, path: str = "") -> _CompletionCommand:
+    """Returns what can be completed in the command line of `parser`, without creating the parsers of sub-commands."""
+    options: list[_CompletionOption] = []
+    positionals: list[tuple[tuple[str, ...], bool]] = []
+    repeat = False
+    subparsers: _SubParsersAction | None = None
+    commands: dict[str, tuple[str, str | None]] = {}
+    for action in parser._actions:
+        if action.option_strings:
+            nargs = _completion_nargs(action.nargs)
+            help = SUPPRESS if action.help is SUPPRESS else _completion_help(action.help)
+            options.append(_CompletionOption(tuple(action.option_strings), nargs, *_completion_values(action), help))
+        elif repeat or subparsers is not None:
+            continue  # the positions of the next arguments are not known
+        elif isinstance(action, _SubParsersAction):
+            subparsers = action
+            helps = {choice.dest: choice.help for choice in action._choices_actions}
+            names: dict[int, str] = {}
+            # the lazy map is read with the methods of `dict`, so the parsers of the sub-commands are not created
+            for name, subparser in dict.items(action.choices):
+                primary = names.setdefault(id(subparser), name)
+                commands[name] = (primary, _completion_help(helps.get(primary)))
+        else:
+            nargs = _completion_nargs(action.nargs)
+            positionals.extend([_completion_values(action)] * max(nargs, 1))
+            repeat = nargs < 0
+    return _CompletionCommand(path, tuple(options), tuple(positionals), repeat, subparsers, commands)
+
+
+def _completion_commands(parser: ArgumentParser, path: str = "") -> Iterator[_CompletionCommand]:
+    command = _completion_command(parser, path)
+    yield command
+    if command.subparsers is not None:
+        for name in dict.fromkeys(primary for primary, help in command.commands.values()):
+            yield from _completion_commands(command.subparsers.choices[name], f"{path} {name}".lstrip())
+
+
+# the cases of a `case` statement: the patterns (literal strings, optionally followed by a wildcard) and the value
+_CompletionCases = list[tuple[list[tuple[str, bool]], Any]]
+
+
+def _completion_cases(commands: Iterable[_CompletionCommand]) -> dict[str, _CompletionCases]:
+    """Returns the cases of the statements of the completion scripts, matching the variables `cmd` (the sub-command),
+    `pos` (the position of the next positional argument), `word` and `opt` (the last option before the cursor).
+
+    The values are the number of values taken by options (`"skip"`), the sub-commands (`"command"`) and, for the
+    completed word, the candidates and whether to complete files (`"value"` of options, `"option"` and `"position"`).
+    """
+    cases: dict[str, _CompletionCases] = {"skip": [], "command": [], "value": [], "option": [], "position": []}
+    for command in commands:
+        path = command.path
+        visible = []
+        for option in command.options:
+            patterns = [(f"{path}|{option_string}", False) for option_string in option.option_strings]
+            if option.nargs != 0:
+                cases["skip"].append((patterns, option.nargs))
+            if option.values or option.files:
+                cases["value"].append((patterns, ([(value, None) for value in option.values], option.files)))
+            if option.help is not SUPPRESS:
+                visible += [(option_string, option.help) for option_string in option.option_strings]
+        if visible:
+            cases["option"].append(([(path, False)], (visible, False)))
+        for position, (values, files) in enumerate(command.positionals):
+            if values or files:
+                last = command.repeat and position == len(command.positionals) - 1
+                pattern = (f"{path}|", True) if last else (f"{path}|{position}", False)
+                cases["position"].append(([pattern], ([(value, None) for value in values], files)))
+        if command.subparsers is not None:
+            position = len(command.positionals)
+            names = [(name, help) for name, (primary, help) in command.commands.items()]
+            cases["position"].append(([(f"{path}|{position}", False)], (names, False)))
+            aliases: dict[str, list[tuple[str, bool]]] = {}
+            for name, (primary, help) in command.commands.items():
+                aliases.setdefault(primary, []).append((f"{path}|{position}|{name}", False))
+            cases["command"] += [(patterns, f"{path} {primary}".lstrip()) for primary, patterns in aliases.items()]
+    return cases
+
+
+def _sh_case(subject: str, cases: _CompletionCases, statements: Callable[[Any], list[str]], indent: str) -> list[str]:
+    lines = [f'{indent}case "{subject}" in']
+    for patterns, value in cases:
+        pattern = "|".join(shlex.quote(literal) + ("*" if wildcard else "") for literal, wildcard in patterns)
+        lines.append(f"{indent}    {pattern}) {'; '.join(statements(value))} ;;")
+    return lines + [f"{indent}esac"] if cases else []
+
+
+def _fish_quote(text: str) -> str:
+    return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def _fish_switch(subject: str, cases: _CompletionCases, statements: Callable[[Any], list[str]], indent: str) -> list[str]:
+    lines = [f'{indent}switch "{subject}"']
+    for patterns, value in cases:
+        pattern = " ".join(_fish_quote(literal + ("*" if wildcard else "")) for literal, wildcard in patterns)
+        lines.append(f"{indent}    case {pattern}")
+        lines += [f"{indent}        {statement}" for statement in statements(value)]
+    return lines + [f"{indent}end"] if cases else []
+
+
+def _sh_completion_script(cases: dict[str, _CompletionCases], function: str, prog: str, shell: str) -> str:
+    def candidates(value: tuple[list[tuple[str, str | None]], bool]) -> list[str]:
+        values, files = value
+        values = [shlex.quote(name) for name, help in values]
+        return ([f"values=({' '.join(values)})"] if values else []) + (["files=1"] if files else [])
+
+    def command(path: str) -> list[str]:
+        return [f"cmd={shlex.quote(path)}", "pos=0", "continue"]
+
+    first = 1 if shell == "bash" else 2  # the arrays of `zsh` start at 1
+    lines = [
+        f'    local cmd="" opt="" word prefix="" i pos=0 skip=0 dashdash=0 files=0',
+        "    local -a values=()",
+        f"    for ((i = {first}; i < cword; i++)); do",
+        '        word="${words[i]}"',
+        "        [[ $word == = ]] && continue  # `bash` splits `--option=value` in three words",
+        "        if ((skip != 0)) && [[ $word != -* ]]; then",
+        "            ((skip > 0)) && skip=$((skip - 1))",
+        "            continue",
+        "        fi",
+        "        skip=0",
+        "        if ((!dashdash)) && [[ $word == -?* ]]; then",
+        "            [[ $word == -- ]] && dashdash=1 && continue",
+        '            opt="$word"',
+        *_sh_case("$cmd|$word", cases["skip"], lambda nargs: [f"skip={nargs}"], " " * 12),
+        "            continue",
+        "        fi",
+        *_sh_case("$cmd|$pos|$word", cases["command"], command, " " * 8),
+        "        pos=$((pos + 1))",
+        "    done",
+        "    if ((!dashdash)) && [[ $cur == --*=* ]]; then",
+        '        opt="${cur%%=*}" prefix="${cur%%=*}=" cur="${cur#*=}" skip=1',
+        "    fi",
+        "    if ((skip != 0)) && [[ $cur != -* ]]; then",
+        *_sh_case("$cmd|$opt", cases["value"], candidates, " " * 8),
+        "    elif ((!dashdash)) && [[ $cur == -* ]]; then",
+        *_sh_case("$cmd", cases["option"], candidates, " " * 8),
+        "    else",
+        *_sh_case("$cmd|$pos", cases["position"], candidates, " " * 8),
+        "    fi",
+    ]
+    if shell == "bash":
+        head = [
+            f"# bash completion for {prog}, generated by dataparsers",
+            f"{function}() {{",
+            '    local -a words=("${COMP_WORDS[@]}")',
+            '    local cword=$COMP_CWORD cur="${COMP_WORDS[COMP_CWORD]}"',
+            '    [[ $cur == = ]] && cur=""',
+        ]
+        tail = [
+            "    COMPREPLY=()",
+            "    local value",
+            '    for value in "${values[@]}"; do',
+            '        [[ $value == "$cur"* ]] && COMPREPLY+=("$prefix$value")',
+            "    done",
+            "    if ((files)); then",
+            "        compopt -o filenames 2>/dev/null",
+            "        local IFS=$'\\n'",
+            '        COMPREPLY+=($(compgen -f -- "$cur"))',
+            "    fi",
+            "}",
+            f"complete -F {function} {shlex.quote(prog)}",
+        ]
+    else:
+        head = [
+            f"#compdef {prog}",
+            f"# zsh completion for {prog}, generated by dataparsers",
+            f"{function}() {{",
+            "    emulate -L zsh",
+            '    local cword=$CURRENT cur="${words[CURRENT]}"',
+        ]
+        tail = [
+            "    [[ -n $prefix ]] && compset -P '*='",
+            "    compadd -a values",
+            "    ((files)) && _files",
+            "    return 0",
+            "}",
+            "if [[ $zsh_eval_context[-1] == loadautofunc ]]; then",
+            f'    {function} "$@"',
+            "else",
+            f"    compdef {function} {shlex.quote(prog)}",
+            "fi",
+        ]
+    return "\n".join(head + lines + tail) + "\n"
+
+
+def _fish_completion_script(cases: dict[str, _CompletionCases], function: str, prog: str) -> str:
+    def candidates(value: tuple[list[tuple[str, str | None]], bool]) -> list[str]:
+        values, files = value
+        values = [_fish_quote(name) + ("" if not help else "\\t" + _fish_quote(help)) for name, help in values]
+        return ([f"set values {' '.join(values)}"] if values else []) + (["set files 1"] if files else [])
+
+    def command(path: str) -> list[str]:
+        return [f"set cmd {_fish_quote(path)}", "set pos 0", "continue"]
+
+    lines = [
+        f"# fish completion for {prog}, generated by dataparsers",
+        f"function {function}",
+        "    set -l words (commandline -opc)",
+        "    set -l cur (commandline -ct)",
+        "    set -l cmd ''",
+        "    set -l opt ''",
+        "    set -l prefix ''",
+        "    set -l pos 0",
+        "    set -l skip 0",
+        "    set -l dashdash 0",
+        "    set -l files 0",
+        "    set -l values",
+        "    for word in $words[2..-1]",
+        "        if test $skip -ne 0; and not string match -q -- '-*' $word",
+        "            test $skip -gt 0; and set skip (math $skip - 1)",
+        "            continue",
+        "        end",
+        "        set skip 0",
+        "        if test $dashdash -eq 0; and string match -q -- '-?*' $word",
+        '            if test "$word" = --',
+        "                set dashdash 1",
+        "                continue",
+        "            end",
+        "            set opt $word",
+        *_fish_switch("$cmd|$word", cases["skip"], lambda nargs: [f"set skip {nargs}"], " " * 12),
+        "            continue",
+        "        end",
+        *_fish_switch("$cmd|$pos|$word", cases["command"], command, " " * 8),
+        "        set pos (math $pos + 1)",
+        "    end",
+        "    if test $dashdash -eq 0; and string match -q -- '--*=*' $cur",
+        "        set opt (string split -m 1 = -- $cur)[1]",
+        "        set prefix $opt=",
+        "        set cur (string split -m 1 = -- $cur)[2]",
+        "        set skip 1",
+        "    end",
+        "    if test $skip -ne 0; and not string match -q -- '-*' $cur",
+        *_fish_switch("$cmd|$opt", cases["value"], candidates, " " * 8),
+        "    else if test $dashdash -eq 0; and string match -q -- '-*' $cur",
+        *_fish_switch("$cmd", cases["option"], candidates, " " * 8),
+        "    else",
+        *_fish_switch("$cmd|$pos", cases["position"], candidates, " " * 8),
+        "    end",
+        "    for value in $values",
+        "        printf '%s%s\\n' $prefix $value",
+        "    end",
+        "    if test $files -eq 1",
+        "        for path in (__fish_complete_path $cur)",
+        "            printf '%s%s\\n' $prefix $path",
+        "        end",
+        "    end",
+        "end",
+        f"complete -c {_fish_quote(prog)} -f -a '({function})'",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def completion_script(cls: type, shell: str, *, prog: str | None = None) -> str:
+    if shell not in _COMPLETION_SHELLS:
+        raise ValueError(f"The argument `shell` must be one of {_COMPLETION_SHELLS}")
+    parser = make_parser(cls)
+    prog = prog or parser.prog
+    function = "_dataparsers_" + re.sub(r"\W", "_", prog)
+    cases = _completion_cases(_completion_commands(parser))
+    if shell == "fish":
+        return _fish_completion_script(cases, function, prog)
+    return _sh_completion_script(cases, function, prog, shell)
+
+
+def _completion_words(line: str) -> tuple[list[str], str]:
+    """Splits a partial command line in the words before the cursor and the word being completed, which may have an
+    unclosed quote."""
+    for closing in ("_", '_"', "_'"):  # the closing marker is removed from the word being completed
+        try:
+            *words, word = split_command(line + closing)
+        except ValueError:
+            continue
+        return words, word[:-1]
+    return line.split(), ""
+
+
+def _completion_paths(prefix: str) -> list[str]:
+    directory, name = os.path.split(prefix)
+    try:
+        entries = list(os.scandir(os.path.expanduser(directory) or os.curdir))
+    except OSError:
+        return []
+    paths = []
+    for entry in entries:
+        if entry.name.startswith(name) and (name.startswith(".") or not entry.name.startswith(".")):
+            paths.append(os.path.join(directory, entry.name) + (os.sep if entry.is_dir() else ""))
+    return sorted(paths)
+
+
+def completions(cls: type, line: str, point: int | None = None) -> list[str]:
+    words, word = _completion_words(line if point is None else line[:point])
+    command = _completion_command(make_parser(cls))
+    options = {option_string: option for option in command.options for option_string in option.option_strings}
+    option: _CompletionOption | None = None
+    skip = position = 0
+    dashdash = False
+    for argument in words[1:]:
+        if skip != 0 and not argument.startswith("-"):
+            skip -= skip > 0
+            continue
+        if not dashdash and argument.startswith("-") and argument != "-":
+            dashdash = argument == "--"
+            option = options.get(argument)
+            skip = 0 if option is None else option.nargs
+            continue
+        skip = 0
+        if command.subparsers is not None and position == len(command.positionals) and argument in command.commands:
+            # only the parser of the selected sub-command is created (and its `dataclass` imported)
+            path = f"{command.path} {command.commands[argument][0]}".lstrip()
+            command = _completion_command(command.subparsers.choices[argument], path)
+            options = {option_string: option for option in command.options for option_string in option.option_strings}
+            position = 0
+            continue
+        position += 1
+
+    prefix = ""
+    if not dashdash and word.startswith("--") and "=" in word:
+        option_string, separator, word = word.partition("=")
+        option, skip, prefix = options.get(option_string), 1, option_string + separator
+    values: Iterable[str] = ()
+    files = False
+    if skip != 0 and not word.startswith("-"):
+        values, files = ((), False) if option is None else (option.values, option.files)
+    elif not dashdash and word.startswith("-"):
+        visible = [option for option in command.options if option.help is not SUPPRESS]
+        values = [option_string for option in visible for option_string in option.option_strings]
+    elif command.subparsers is not None and position == len(command.positionals):
+        values = command.commands
+    elif position < len(command.positionals) or (command.repeat and command.positionals):
+        values, files = command.positionals[min(position, len(command.positionals) - 1)]
+    candidates = [value for value in values if value.startswith(word)]
+    if files:
+        candidates += _completion_paths(word)
+    return [prefix + candidate for candidate in candidates]
+
+
+def autocomplete(cls: type) -> None:
+    line = os.environ.get("COMP_LINE")
+    if line is None:
+        return
+    point = os.environ.get("COMP_POINT")
+    if point is not None and point.isdigit():  # an offset in bytes
+        line = os.fsdecode(os.fsencode(line)[: int(point)])
+    candidates = completions(cls, line)
+    # `bash` (with `complete -C`) passes the word being completed, which is split at the `=` of `--option=value`
+    word = _completion_words(line)[1]
+    if "COMP_TYPE" in os.environ and len(sys.argv) > 2 and word.endswith(sys.argv[2]):
+        candidates = [candidate[len(word) - len(sys.argv[2]) :] for candidate in candidates]
+    sys.stdout.write("".join(f"{candidate}\n" for candidate in candidates))
+    sys.stdout.flush()
+    sys.exit(0)
+
+
 # %% ###########################################################################################################################
@@ -1,17 +1,23 @@
-from __future__ import annotations
-
+import gc
 import os
+import pickle
+import shutil
+import subprocess
 import sys
 import pytest
 
 # add `src` folder to the `sys.path`, relative to the CWD
 sys.path.insert(0, os.path.abspath("./src"))
 
-from dataclasses import dataclass, fields
-from dataparsers import arg, dataparser, parse, make_parser
+from argparse import SUPPRESS
+from dataclasses import KW_ONLY, dataclass, fields
+from dataparsers import arg, dataparser, parse, parse_known, parse_many, parse_stream, make_parser, make_plan, default
+from dataparsers import subparsers, subparser, split_command, parse_async, completion_script, completions, autocomplete
+from dataparsers import ParseError, SubParserSpec, parser_cache_info, clear_parser_cache, set_parser_cache_size
 from dataparsers import group, mutually_exclusive_group
 from resources import HelpDisplay, CapSys
-from typing import ClassVar
+from pathlib import Path
+from typing import Any, ClassVar
 
 
 def test_00_only_positionals(capsys: CapSys):
@@ -231,3 +237,1000 @@ def test_14_group_togetherWith_mutuallyExclusiveGroupId(capsys: CapSys):
     output = capsys.readouterr().out
     g = HelpDisplay(output).group("Group1")
     assert all(name in g for name in ["--sam", "--ham", "--foo", "--bar"])
+
+
+def test_15_parser_cache_reuses_parser():
+    @dataclass
+    class Args:
+        string: str
+        integer: int = 1
+
+    clear_parser_cache()
+    assert parse(Args, ["a"]) == Args("a", 1)
+    assert parse(Args, ["b", "--integer", "2"]) == Args("b", 2)
+    info = parser_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+
+def test_16_parser_cache_weak_keys_and_lru_eviction():
+    clear_parser_cache()
+    set_parser_cache_size(2)
+    try:
+        classes = [dataclass(type(f"Args{i}", (), {"__annotations__": {"x": int}})) for i in range(3)]
+        for cls in classes:
+            parse(cls, ["1"])
+        assert parser_cache_info().currsize == 2
+        parse(classes[1], ["1"])  # the used parser is kept when the cache is full
+        parse(classes[0], ["1"])
+        parse(classes[1], ["1"])
+        assert parser_cache_info().misses == 4
+        del cls, classes
+        gc.collect()
+        assert parser_cache_info().currsize == 0
+    finally:
+        set_parser_cache_size(128)
+
+
+def test_17_make_parser_does_not_modify_the_class(capsys: CapSys):
+    @dataparser(help_formatter=lambda text: f"[{text}]")
+    class Args:
+        flag: bool = arg(help="a flag")
+        numbers: list[int] = arg(nargs="*", help="some numbers")
+
+    types_before = [f.type for f in fields(Args)]
+    defaults_before = [f.default for f in fields(Args)]
+    for _ in range(2):
+        make_parser(Args).print_help()
+        output = capsys.readouterr().out
+        assert "[a flag]" in output and "[[a flag]]" not in output
+    assert [f.type for f in fields(Args)] == types_before
+    assert [f.default for f in fields(Args)] == defaults_before
+    assert parse(Args, ["--flag", "1", "2"]) == Args(flag=True, numbers=[1, 2])
+
+
+def test_18_parser_plan_is_immutable_and_picklable():
+    @dataparser(prog="PROG")
+    class Args:
+        MyGroup: ClassVar = group("group1")
+        string: str = arg(group=MyGroup)
+        integer: int = arg("-i", default=1, mutually_exclusive_group=1)
+        number: float = arg("-n", default=1.0, mutually_exclusive_group=1)
+
+    plan = make_plan(Args)
+    assert plan is make_plan(Args)
+    assert dict(plan.parser_kwargs) == {"prog": "PROG"}
+    assert [a.dest for a in plan.arguments] == ["string", "integer", "number"]
+    assert [g.key for g in plan.groups] == ["MyGroup"]
+    assert plan.arguments[1].name_or_flags == ("-i", "--integer")
+    assert plan.arguments[1].mutually_exclusive_group == plan.arguments[2].mutually_exclusive_group == 1
+    copy = pickle.loads(pickle.dumps(plan))
+    assert copy == plan and hash(copy) == hash(plan)
+    assert plan.materialize().parse_args(["a", "-i", "2"]) == make_parser(Args).parse_args(["a", "-i", "2"])
+
+
+def test_19_disk_cache_of_parser_plans(tmp_path, monkeypatch):
+    import importlib
+    import dataparsers.dataparsers as module
+
+    source = tmp_path / "cached_cli.py"
+    source.write_text(
+        "import os\n"
+        "from dataparsers import arg, dataparser\n"
+        f"@dataparser(prog='cached', disk_cache={str(tmp_path / 'cache')!r})\n"
+        "class Args:\n"
+        "    foo: str\n"
+        "    bar: int = arg('-b', default=int(os.environ.get('CACHED_BAR', '42')), help='bar help')\n"
+    )
+    monkeypatch.delenv("CACHED_BAR", raising=False)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    cached_cli = importlib.import_module("cached_cli")
+    plan = make_plan(cached_cli.Args)
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    cached_cli = importlib.reload(cached_cli)
+
+    def fail(cls):
+        raise AssertionError("the plan should be loaded from the disk cache")
+
+    compile_plan = module._compile_plan
+    monkeypatch.setattr(module, "_compile_plan", fail)
+    assert make_plan(cached_cli.Args) == plan
+    assert parse(cached_cli.Args, ["x", "-b", "1"]) == cached_cli.Args("x", 1)
+
+    # defaults computed at run time are not taken from the cached plan
+    monkeypatch.setattr(module, "_compile_plan", compile_plan)
+    monkeypatch.setenv("CACHED_BAR", "7")
+    cached_cli = importlib.reload(cached_cli)
+    assert parse(cached_cli.Args, ["x"]) == cached_cli.Args("x", 7)
+
+
+def test_20_specialized_parse_function_matches_argparse(capsys: CapSys):
+    @dataparser(prog="PROG")
+    class Args:
+        name: str
+        count: int = arg("-c", default="3")
+        ratio: float = arg("-r", default=0.5, choices=[0.5, 1.0])
+        flag: bool = arg("-f")
+        post: int = default(7)
+
+    argvs = [
+        ["x"],
+        ["x", "-c", "5", "-f"],
+        ["-r", "1.0", "x", "--count=2"],
+        ["x", "-c", "-1"],
+        ["x", "--cou", "4"],
+        ["x", "-c", "a"],
+        ["x", "-r", "2"],
+        ["x", "y"],
+        ["--flag=1", "x"],
+        [],
+    ]
+    for argv in argvs:
+        try:
+            expected = Args(**vars(make_parser(Args).parse_args(argv)))
+        except SystemExit as error:
+            expected = error.code
+        try:
+            result = parse(Args, argv)
+        except SystemExit as error:
+            result = error.code
+        assert result == expected
+    assert parse(Args, ["x"]) == Args(name="x", count=3, ratio=0.5, flag=False, post=7)
+    capsys.readouterr()
+
+
+def test_21_table_backend_matches_argparse(capsys: CapSys):
+    @dataparser(prog="PROG", backend="table")
+    class Args:
+        foo: bool = arg("-f")
+        subparser_name: str = subparsers()
+        a: ClassVar = subparser(help="a help", defaults={"extra": 1})
+        bar: int | None = arg(subparser=a)
+        b: ClassVar = subparser(help="b help")
+        baz: list[str] | None = arg("-z", nargs="*", subparser=b, default=None)
+        qux: str | None = arg(subparser=b, nargs="?", default="q")
+        extra: int = default(0)
+
+    argvs = [
+        ["a", "12"],
+        ["-f", "b", "-z", "X", "Y", "last"],
+        ["b", "value"],
+        ["b"],
+        ["a"],
+        ["a", "x"],
+        ["c"],
+        ["-f", "a", "1", "-f"],
+        [],
+    ]
+    for argv in argvs:
+        try:
+            expected = Args(**vars(make_parser(Args).parse_args(argv)))
+        except SystemExit as error:
+            expected = error.code
+        for backend in ["table", "argparse"]:
+            try:
+                result = parse(Args, argv, backend=backend)
+            except SystemExit as error:
+                result = error.code
+            assert result == expected
+    capsys.readouterr()
+
+
+def test_22_subparsers_are_built_only_when_selected(capsys: CapSys):
+    @dataparser(prog="PROG")
+    class Args:
+        command: str = subparsers(help="sub-command help")
+        a: ClassVar = subparser(help="a help", aliases=["aa"])
+        x: int | None = arg("-x", subparser=a)
+        b: ClassVar = subparser(help="b help")
+        y: str | None = arg("-y", subparser=b)
+
+    parser = make_parser(Args)
+    (action,) = parser._subparsers._group_actions
+    built = lambda: [name for name, value in dict.items(action.choices) if not isinstance(value, SubParserSpec)]
+
+    parser.format_help()
+    assert built() == []
+    assert Args(**vars(parser.parse_args(["aa", "-x", "1"]))) == Args(command="aa", x=1, y=None)
+    assert built() == ["a", "aa"]
+    assert list(action.choices) == ["a", "aa", "b"]
+    assert parse(Args, ["b", "-y", "z"]) == Args(command="b", x=None, y="z")
+    with pytest.raises(SystemExit):
+        parser.parse_args(["c"])
+    assert "invalid choice: 'c'" in capsys.readouterr().err
+
+
+def test_23_subparser_dataclass_is_imported_only_when_selected(tmp_path, monkeypatch, capsys: CapSys):
+    (tmp_path / "heavy_command.py").write_text(
+        "from dataparsers import arg, dataparser, default\n"
+        "@dataparser(description='train description')\n"
+        "class TrainArgs:\n"
+        "    epochs: int = arg('-e', default=1)\n"
+        "    data: str = arg(help='data help')\n"
+        "    kind: str = default('train')\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "heavy_command", raising=False)
+
+    @dataparser(prog="PROG")
+    class Args:
+        command: Any = subparsers()
+        verbose: bool = arg("-v")
+        train: ClassVar = subparser(dataclass="heavy_command:TrainArgs", help="train help")
+        test: ClassVar = subparser(help="test help")
+
+    assert "train help" in make_parser(Args).format_help()
+    assert parse(Args, ["-v", "test"]) == Args(command="test", verbose=True)
+    assert "heavy_command" not in sys.modules
+
+    args = parse(Args, ["train", "-e", "3", "data.csv"])
+    TrainArgs = sys.modules["heavy_command"].TrainArgs
+    assert args == Args(command=TrainArgs(epochs=3, data="data.csv", kind="train"), verbose=False)
+    assert parse(Args, ["-v", "train", "x"], backend="table").command == TrainArgs(epochs=1, data="x")
+
+    with pytest.raises(SystemExit):
+        parse(Args, ["train", "--help"])
+    output = capsys.readouterr().out
+    assert output.startswith("usage: PROG train") and "train description" in output and "data help" in output
+
+    @dataparser
+    class NoField:
+        train: ClassVar = subparser(dataclass="heavy_command:TrainArgs")
+
+    with pytest.raises(ValueError):
+        make_parser(NoField)
+    with pytest.raises(ValueError):
+        subparser(dataclass="heavy_command.TrainArgs")
+
+
+def test_24_help_formatter_is_called_only_when_help_is_rendered(capsys: CapSys):
+    calls = []
+
+    def formatter(text: str) -> str:
+        calls.append(text)
+        return text.upper()
+
+    @dataparser(prog="PROG", help_formatter=formatter)
+    class Args:
+        name: str = arg("-n", default="", help="the name")
+        command: str | None = subparsers()
+        sub: ClassVar = subparser(help="sub help")
+        count: int = arg("-c", default=1, help="the count", subparser=sub)
+
+    assert parse(Args, ["-n", "x", "sub", "-c", "2"]) == Args(name="x", command="sub", count=2)
+    assert calls == []
+
+    for _ in range(2):
+        make_parser(Args).print_help()
+        assert "THE NAME" in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        parse(Args, ["sub", "--help"])
+    output = capsys.readouterr().out
+    assert "THE COUNT" in output and "SHOW THIS HELP" not in output
+    assert calls == ["the name", "the count"]
+
+
+def test_25_annotations_are_resolved_in_the_class_module(tmp_path, monkeypatch):
+    import importlib
+    from fractions import Fraction
+
+    (tmp_path / "annotated_cli.py").write_text(
+        "from __future__ import annotations\n"
+        "from fractions import Fraction as fraction\n"
+        "from typing import ClassVar, Optional\n"
+        "from dataparsers import arg, dataparser, default, subparser, subparsers\n"
+        "class Point:\n"
+        "    def __init__(self, text):\n"
+        "        self.xy = tuple(map(float, text.split(',')))\n"
+        "@dataparser\n"
+        "class Args:\n"
+        "    point: Point = arg('-x')\n"
+        "    points: list[Point] = arg('-p', nargs='*', default=None)\n"
+        "    command: str | None = subparsers()\n"
+        "    run: ClassVar[NotDefinedAnywhere] = subparser()\n"
+        "    extra: NotDefinedEither = default(None)\n"
+        "    count: Optional[int] = arg('-c', default=None)\n"
+        "    fraction: fraction = arg('-f', default=None)\n"
+        "@dataparser\n"
+        "class Invalid:\n"
+        "    value: Unknown = arg('-v', default=None)\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    annotated_cli = importlib.import_module("annotated_cli")
+
+    args = parse(annotated_cli.Args, ["-p", "3,4", "5,6", "-x", "1,2", "run"])
+    assert args.point.xy == (1.0, 2.0)
+    assert [p.xy for p in args.points] == [(3.0, 4.0), (5.0, 6.0)]
+    assert args.command == "run" and args.extra is None and args.count is None
+    assert parse(annotated_cli.Args, ["-x", "0,0", "-c", "3"]).count == 3
+    assert parse(annotated_cli.Args, ["-x", "0,0", "-f", "1/3"]).fraction == Fraction(1, 3)  # not the default `None`
+    with pytest.raises(NameError, match="Unknown"):
+        make_plan(annotated_cli.Invalid)
+
+
+def test_26_concurrent_parsing_with_a_shared_cached_parser():
+    import threading
+
+    @dataparser(prog="PROG", help_formatter=str.upper)
+    class Args:
+        name: str = arg("-n", default="")
+        numbers: list[int] = arg("-x", nargs="*", default=None)
+        flag: bool = arg("-f", default=False)
+        command: str | None = subparsers()
+        a: ClassVar = subparser(aliases=["aa"])
+        count: int = arg("-c", default=0, subparser=a)
+        b: ClassVar = subparser()
+        text: str = arg("-t", default="", subparser=b)
+
+    cases = [
+        (["-n", "x", "-x", "1", "2"], Args(name="x", numbers=[1, 2])),
+        (["-f", "a", "-c", "3"], Args(flag=True, command="a", count=3)),
+        (["aa", "-c", "4"], Args(command="aa", count=4)),
+        (["b", "-t", "y"], Args(command="b", text="y")),
+        (["--name=z", "-f"], Args(name="z", flag=True)),
+    ]
+    usage = make_parser(Args).format_usage()
+    errors: list[BaseException] = []
+    barrier = threading.Barrier(8)
+
+    def work(index: int) -> None:
+        try:
+            barrier.wait()
+            for i in range(200):
+                argv, expected = cases[(index + i) % len(cases)]
+                assert parse(Args, argv) == expected
+                assert parse_known(Args, argv + ["--extra"], metavar="EXTRA") == (expected, ["--extra"])
+                assert parse_known(Args, argv) == (expected, [])
+        except BaseException as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert make_parser(Args).format_usage() == usage
+    assert parse_known(Args, [], metavar="EXTRA") == (Args(), [])
+
+
+def test_27_raise_errors_mode(capsys: CapSys):
+    @dataparser(prog="PROG")
+    class Args:
+        count: int = arg("-c", default=0, choices=[0, 1, 2])
+        command: str | None = subparsers()
+        sub: ClassVar = subparser()
+        name: str = arg(subparser=sub)
+
+    cases = [
+        (["-c", "x"], "-c/--count", "invalid int value: 'x'", "x"),
+        (["-c", "5"], "-c/--count", "invalid choice: 5 (choose from 0, 1, 2)", "5"),
+        (["-c"], "-c/--count", "expected one argument", None),
+        (["other"], "command", "invalid choice: 'other' (choose from 'sub')", "other"),
+        (["sub", "x", "y"], None, "unrecognized arguments: y", "y"),
+    ]
+    for argv, argument, reason, token in cases:
+        with pytest.raises(ParseError) as info:
+            parse(Args, argv, raise_errors=True)
+        assert (info.value.argument, info.value.reason, info.value.token) == (argument, reason, token)
+        assert info.value.usage.startswith("usage: PROG")
+    assert capsys.readouterr() == ("", "")
+
+    with pytest.raises(ParseError) as info:
+        parse_known(Args, ["sub", "--extra"], raise_errors=True)
+    assert str(info.value) == "the following arguments are required: name"
+    assert info.value.usage.startswith("usage: PROG sub")
+    assert parse_known(Args, ["sub", "x", "--extra"], raise_errors=True) == (Args(command="sub", name="x"), ["--extra"])
+
+    with pytest.raises(SystemExit):
+        parse(Args, ["-c", "x"])
+    assert "invalid int value" in capsys.readouterr().err
+
+
+def test_28_parse_many(tmp_path, monkeypatch, capsys: CapSys):
+    import importlib
+
+    (tmp_path / "batch_jobs.py").write_text(
+        "from dataparsers import arg, dataparser\n"
+        "@dataparser(prog='job')\n"
+        "class Job:\n"
+        "    name: str\n"
+        "    retries: int = arg('-r', default=0)\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    Job = importlib.import_module("batch_jobs").Job
+
+    argvs = [["a"], ["b", "-r", "x"], ("c", "-r", "2"), [], ["d", "e"]] * 3
+    for workers in [None, 2]:
+        results = parse_many(Job, argvs, workers=workers)
+        assert results[0::5] == [Job("a")] * 3 and results[2::5] == [Job("c", 2)] * 3
+        errors = [results[i] for i in [1, 3, 4]]
+        assert all(isinstance(error, ParseError) for error in errors)
+        assert [(e.argument, e.token) for e in errors] == [("-r/--retries", "x"), (None, None), (None, "e")]
+        assert str(errors[1]) == "the following arguments are required: name"
+        assert errors[0].usage == "usage: job [-h] [-r RETRIES] name\n"
+
+    error = pickle.loads(pickle.dumps(errors[0]))
+    assert (str(error), error.token, error.usage, error.parser) == (str(errors[0]), "x", errors[0].usage, None)
+
+    results = parse_many(Job, [["a"], ["--help"], ["b"]])
+    assert results[0::2] == [Job("a"), Job("b")] and isinstance(results[1], SystemExit) and results[1].code == 0
+    assert capsys.readouterr().out.startswith("usage: job [-h] [-r RETRIES] name")
+    with pytest.raises(ValueError):
+        parse_many(Job, argvs, workers=0)
+
+
+def test_29_parse_stream(capsys: CapSys):
+    import io
+
+    @dataparser(prog="job")
+    class Job:
+        name: str
+        retries: int = arg("-r", default=0)
+
+    lines = io.StringIO("a\n\n'b c' -r 2\n  d --retries=3  \n")
+    assert list(parse_stream(Job, lines)) == [Job("a"), Job("b c", 2), Job("d", 3)]
+
+    records = io.StringIO("a -r 1\0'x\ny'\0\0last")
+    assert list(parse_stream(Job, records, separator="\0")) == [Job("a", 1), Job("x\ny"), Job("last")]
+
+    stream = parse_stream(Job, io.StringIO("a\nb -r x\nc\n"), raise_errors=True)
+    assert next(stream) == Job("a")
+    with pytest.raises(ParseError) as info:
+        next(stream)
+    assert (info.value.line, str(info.value)) == (2, "line 2: argument -r/--retries: invalid int value: 'x'")
+
+    with pytest.raises(ParseError) as info:
+        list(parse_stream(Job, io.StringIO("a\n'b\n"), raise_errors=True))
+    assert str(info.value) == "line 2: invalid command line: No closing quotation"
+
+    with pytest.raises(SystemExit):
+        list(parse_stream(Job, io.StringIO("a\n-r 1\n")))
+    assert "job: error: line 2: the following arguments are required: name" in capsys.readouterr().err
+
+
+def test_30_split_command_conforms_to_shlex():
+    import random
+    import shlex
+
+    def outcome(function, command):
+        try:
+            return function(command)
+        except ValueError as error:
+            return str(error)
+
+    commands = [
+        "",
+        "   ",
+        "a b  c\td\ne\r",
+        "a#b # c",
+        "'a b' \"c d\" e'f'\"g\"",
+        "''  \"\" x''",
+        "a\\ b \\\\ \\' \\\" \\\n c\\",
+        "\"a \\\" \\\\ \\$ \\n b\"",
+        "'a \\ b' 'c\"d' \"e'f\"",
+        "'unterminated",
+        "\"unterminated \\\"",
+        "x\x0by \xa0z\u2003w",
+        "ação 'ção' \"日本\" 語",
+    ]
+    rng = random.Random(0)
+    alphabet = "ab \t\n'\"\\#$\x0b\xa0é"
+    commands += ["".join(rng.choice(alphabet) for _ in range(rng.randrange(12))) for _ in range(3000)]
+    for command in commands:
+        assert outcome(split_command, command) == outcome(shlex.split, command), command
+
+    @dataparser
+    class Args:
+        name: str
+        count: int = arg("-c", default=0)
+
+    assert parse(Args, "'a b' -c 2") == Args("a b", 2)
+    assert parse_known(Args, "x --extra 'y z'") == (Args("x"), ["--extra", "y z"])
+    assert parse_many(Args, ["a", "b -c x"])[0] == Args("a")
+
+
+def test_31_parse_async_with_asynchronous_converters(capsys: CapSys):
+    import asyncio
+
+    running = []
+    concurrency = []
+
+    async def user(text: str) -> str:
+        running.append(text)
+        concurrency.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(text)
+        if not text.isalpha():
+            raise ValueError(text)
+        return text.upper()
+
+    @dataparser(prog="PROG")
+    class Args:
+        owner: str = arg("-o", type=user, default="nobody")
+        users: list[str] = arg("-u", nargs="*", type=user, default=None)
+        role: str = arg("-r", type=user, choices=["ADMIN", "GUEST"], default=None)
+        count: int = arg("-c", default=0)
+
+    args = asyncio.run(parse_async(Args, "-u ann bob -r admin -c 2"))
+    assert args == Args(owner="NOBODY", users=["ANN", "BOB"], role="ADMIN", count=2)
+    assert max(concurrency) == 4
+
+    with pytest.raises(ParseError) as info:
+        asyncio.run(parse_async(Args, ["-u", "ann", "b0b", "-r", "x1"], raise_errors=True))
+    assert (str(info.value), info.value.token) == ("argument -u/--users: invalid user value: 'b0b'", "b0b")
+    with pytest.raises(ParseError) as info:
+        asyncio.run(parse_async(Args, ["-r", "other"], raise_errors=True))
+    assert info.value.argument == "-r/--role" and info.value.reason.startswith("invalid choice: 'OTHER'")
+    with pytest.raises(SystemExit):
+        asyncio.run(parse_async(Args, ["-o", "1", "-c", "x"]))
+    assert "argument -c/--count: invalid int value: 'x'" in capsys.readouterr().err
+
+
+def test_32_concurrent_conversion_of_nargs_lists(capsys: CapSys):
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    threads = set()
+    calls = []
+
+    def manifest(path: str) -> tuple[str, int]:
+        threads.add(threading.get_ident())
+        calls.append((threading.get_ident(), path))
+        time.sleep(0.002)
+        return (path, int(path))
+
+    @dataparser(prog="PROG")
+    class Args:
+        manifests: list[tuple[str, int]] = arg(nargs="+", type=manifest, concurrent="thread")
+        extra: list[int] = arg("-e", nargs="*", default=None, concurrent=ThreadPoolExecutor(2))
+
+    paths = [str(i % 7) for i in range(40)]
+    for backend in ["argparse", "table"]:
+        args = parse(Args, paths + ["-e", "1", "2"], backend=backend)
+        assert args == Args([(p, int(p)) for p in paths], [1, 2])
+        assert args.manifests[0] is not args.manifests[7]
+    assert len(threads) > 1 and threading.get_ident() not in threads
+
+    calls.clear()
+    with pytest.raises(ParseError) as info:
+        parse(Args, ["1", "x", "2", "y"], raise_errors=True)
+    assert (info.value.argument, info.value.token) == ("manifests", "x")
+    assert [path for thread, path in calls if thread == threading.get_ident()] == ["x"]  # only the error is raised again
+    with pytest.raises(SystemExit):
+        parse(Args, ["1", "-e", "2", "z"])
+    assert "argument -e/--extra: invalid int value: 'z'" in capsys.readouterr().err
+
+    @dataparser
+    class Numbers:
+        numbers: list[int] = arg(nargs="+", concurrent="process")
+
+    assert parse(Numbers, ["3", "1", "2"]) == Numbers([3, 1, 2])
+    with pytest.raises(ValueError):
+        arg(concurrent="fiber")
+
+
+def test_33_numeric_array_containers(capsys: CapSys):
+    from array import array
+
+    @dataparser(prog="PROG", fromfile_prefix_chars="@")
+    class Simulation:
+        loads: list[float] = arg(nargs="+", container="array")
+        steps: list[int] = arg("-s", nargs="*", default=None, container="array")
+        pair: list[int] = arg("-p", nargs=2, default=None, type=int, container="array", choices=[1, 2, 3])
+
+    args = parse(Simulation, ["1.5", "inf", "-s", "1", "+2", "3", "-p", "3", "1"])
+    assert args == Simulation(array("d", [1.5, float("inf")]), array("q", [1, 2, 3]), array("q", [3, 1]))
+    assert parse(Simulation, "0 -s").steps == array("q")
+
+    for argv, token, message in [
+        ("1 x", "x", "argument loads: invalid float value: 'x'"),
+        ("1 -s 1 2.5", "2.5", "argument -s/--steps: invalid int value: '2.5'"),
+        ("1 -s 99999999999999999999", "99999999999999999999", "invalid int value: '99999999999999999999'"),
+    ]:
+        with pytest.raises(ParseError) as info:
+            parse(Simulation, argv, raise_errors=True)
+        assert info.value.token == token and message in str(info.value)
+    with pytest.raises(SystemExit):
+        parse(Simulation, "1 -p 1 4")
+    assert "argument -p/--pair: invalid choice: 4" in capsys.readouterr().err
+
+    with pytest.raises(ValueError):
+        arg(container="list", nargs="+")
+    with pytest.raises(ValueError):
+        arg(container="array")
+    with pytest.raises(TypeError):
+
+        @dataparser
+        class Names:
+            names: list[str] = arg(nargs="+", container="array")
+
+        make_parser(Names)
+
+    numpy = pytest.importorskip("numpy")
+
+    @dataparser
+    class Vector:
+        values: list[float] = arg(nargs="+", container="numpy")
+
+    values = parse(Vector, [str(i / 4) for i in range(1000)]).values
+    assert isinstance(values, numpy.ndarray) and values.dtype == numpy.float64
+    assert numpy.array_equal(values, numpy.arange(1000) / 4)
+
+
+def test_34_compact_instances():
+    from dataclasses import FrozenInstanceError
+
+    @dataparser(prog="job", frozen=True, slots=True, tuples=True)
+    class Job:
+        name: str = arg("-n", default="")
+        tags: list[str] = arg("-t", action="append", default=None)
+        sizes: list[int] = arg("-s", nargs="+", default=None)
+        preset: list[int] = arg("-p", action="store_const", const=[1, 2], default=None)
+        command: str | None = subparsers()
+        run: ClassVar = subparser()
+        fast: bool = arg("-f", default=False, subparser=run)
+
+    job = parse(Job, "-n x -s 1 2 -t a -t b run -f")
+    assert job == Job("x", ("a", "b"), (1, 2), None, "run", True)
+    assert not hasattr(job, "__dict__") and hash(job) == hash(Job("x", ("a", "b"), (1, 2), None, "run", True))
+    with pytest.raises(FrozenInstanceError):
+        job.name = "y"  # type: ignore
+    for backend in ["argparse", "table"]:
+        assert parse(Job, "-n x -p", backend=backend) == Job("x", None, None, (1, 2), None, False)
+    assert parse_known(Job, "-s 3 --other")[0].sizes == (3,)
+
+    @dataparser(tuples=True)
+    class Simple:
+        preset: list[int] = arg("-p", action="store_const", const=[1, 2], default=None)
+
+    assert parse(Simple, "-p") == Simple((1, 2)) and parse(Simple, []) == Simple(None)
+
+    @dataclass
+    class Plain:
+        name: str
+
+    with pytest.raises(ValueError):
+        dataparser(slots=True)(Plain)
+    assert dataparser(prog="plain")(Plain) is Plain
+
+
+def test_35_instances_created_by_fast_parse():
+    @dataparser
+    class Positional:
+        name: str
+        count: int = arg("-c", default=1)
+        post: str = default("x")
+
+    @dataparser
+    class KeywordOnly:
+        name: str
+        _: KW_ONLY
+        count: int = arg("-c", default=1)
+
+    @dataparser
+    class PostInit:
+        name: str
+        count: int = arg("-c", default=1)
+
+        def __post_init__(self):
+            self.name = self.name.upper()
+
+    @dataparser
+    class CustomInit:
+        name: str
+        count: int = arg("-c", default=1)
+
+        def __init__(self, count: int, name: str):
+            self.name, self.count = name * count, count
+
+    assert parse(Positional, "a -c 2") == Positional("a", 2, "x")
+    assert parse(KeywordOnly, "a -c 2") == KeywordOnly("a", count=2)
+    assert parse(PostInit, "a -c 2") == PostInit("A", 2)
+    assert vars(parse(CustomInit, "a -c 2")) == {"name": "aa", "count": 2}
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1 << 20])
+def test_36_argument_files(tmp_path, monkeypatch, chunk_size: int):
+    import argparse
+    import gzip
+
+    monkeypatch.setattr("dataparsers.dataparsers._ARGS_FILE_CHUNK_SIZE", chunk_size)
+
+    @dataparser(prog="sim", fromfile_prefix_chars="@")
+    class Simulation:
+        paths: list[str] = arg(nargs="*")
+        seed: int = arg("-s", default=0)
+        sizes: list[int] = arg("-n", nargs="+", default=None)
+
+    nested = tmp_path / "nested.txt"
+    nested.write_text("nested 1\nnested 2\n")
+    lines = tmp_path / "lines.txt"
+    lines.write_bytes(f"-s\n7\npath 1\n\nação\r\nlast\r@{nested}\nend".encode())
+    plain = argparse.ArgumentParser(fromfile_prefix_chars="@")
+    plain.add_argument("paths", nargs="*")
+    plain.add_argument("-s", dest="seed", type=int, default=0)
+    plain.add_argument("-n", dest="sizes", type=int, nargs="+")
+    args = parse(Simulation, [f"@{lines}"])
+    assert vars(args) == vars(plain.parse_args([f"@{lines}"]))
+    assert args.paths == ["path 1", "", "ação", "last", "nested 1", "nested 2", "end"] and args.seed == 7
+
+    nul = tmp_path / "paths.bin"
+    nul.write_bytes(b"-n\x00" + b"".join(b"%d\x00" % i for i in range(1000)) + b"--\x00a\nb\x00c d")
+    compressed = tmp_path / "paths.gz"
+    compressed.write_bytes(gzip.compress(nul.read_bytes()))
+    for path in [nul, compressed]:
+        assert parse(Simulation, [f"@{path}"]) == Simulation(["a\nb", "c d"], 0, list(range(1000)))
+    late = tmp_path / "late.bin"  # the first NUL character after the first chunk
+    late.write_bytes(b"line 1\nline 2\n" * 100 + b"\0last\0")
+    assert parse(Simulation, [f"@{late}"]) == Simulation(["line 1\nline 2\n" * 100, "last"])
+    empty = tmp_path / "empty.txt"
+    empty.touch()
+    assert parse(Simulation, [f"@{empty}"]) == Simulation([])
+
+    with pytest.raises(ParseError) as info:
+        parse(Simulation, [f"@{tmp_path / 'missing.txt'}"], raise_errors=True)
+    assert "No such file or directory" in info.value.reason
+    nul.write_bytes(b"-n\x001\x00x\x003\x00")
+    with pytest.raises(ParseError) as info:
+        parse(Simulation, [f"@{nul}"], raise_errors=True)
+    assert (info.value.argument, info.value.token) == ("-n/--sizes", "x")
+
+    converted = []
+
+    def number(text: str) -> int:
+        converted.append(text)
+        return int(text)
+
+    @dataparser(prog="sim")
+    class Counted:
+        sizes: list[int] = arg("-n", nargs="+", type=number, default=None)
+
+    with pytest.raises(ParseError) as info:
+        parse(Counted, "-n 1 2 x 4", raise_errors=True)
+    assert info.value.token == "x" and converted == ["1", "2", "x", "x"]  # only the invalid string is converted again
+
+
+def test_37_config_files(tmp_path, capsys: CapSys):
+    if sys.version_info < (3, 11):
+        pytest.importorskip("tomli")
+    (tmp_path / "base.toml").write_text('seed = 3\npaths = ["a", "b"]\nverbose = true\n[tool.sim]\nseed = 9\n')
+    (tmp_path / "local.json").write_text('{"mode": "fast", "sizes": [1, "2"]}')
+    (tmp_path / "site.ini").write_text("[sim]\nmode = slow\nverbose = no\nsizes = 4 5\n")
+    files = [tmp_path / "base.toml", tmp_path / "missing.json", tmp_path / "local.json"]
+
+    @dataparser(prog="sim", config_files=files, disk_cache=tmp_path / "cache")
+    class Simulation:
+        seed: int = arg("-s", default=0)
+        paths: list[str] = arg("-p", nargs="*", default=None)
+        mode: str = arg("-m", default="x", choices=["x", "fast", "slow"])
+        sizes: list[int] = arg("-n", nargs="+", default=None)
+        verbose: bool = arg("-v", default=False)
+
+    for backend in ["argparse", "table"]:
+        args = parse(Simulation, [], backend=backend)
+        assert args == Simulation(3, ["a", "b"], "fast", [1, 2], True)
+        args.paths.append("c")
+        assert parse(Simulation, "-s 5 -m x -p", backend=backend) == Simulation(5, [], "x", [1, 2], True)
+    assert parse_known(Simulation, "-s 5 --other") == (Simulation(5, ["a", "b"], "fast", [1, 2], True), ["--other"])
+    assert len(list((tmp_path / "cache").glob("config-*.pickle"))) == 2
+
+    (tmp_path / "local.json").write_text('{"mode": "slow"}')
+    assert parse(Simulation, []).mode == "slow"
+
+    @dataparser(prog="sim", config_files=[tmp_path / "base.toml", tmp_path / "site.ini"], config_section="sim")
+    class Section:
+        seed: int = arg("-s", default=0)
+        mode: str = arg("-m", default="x")
+        sizes: list[int] = arg("-n", nargs="+", default=None)
+        verbose: bool = arg("-v", default=True)
+
+    @dataparser(prog="sim", config_files=[tmp_path / "base.toml"], config_section="tool.sim")
+    class Table:
+        seed: int = arg("-s", default=0)
+
+    assert parse(Section, []) == Section(0, "slow", [4, 5], False)
+    assert parse(Table, []) == Table(9)
+
+    for content, message in [
+        ('{"mode": "other"}', "argument -m/--mode: invalid choice: 'other'"),
+        ('{"level": 1}', "unknown option 'level' in config file"),
+        ('{"count": 2}', "option 'count' of the sub-command 'sub' can not be set in config file"),
+        ('{"mode": ', "invalid config file"),
+    ]:
+        (tmp_path / "bad.json").write_text(content)
+
+        @dataparser(prog="sim", config_files=[tmp_path / "bad.json"])
+        class Invalid:
+            mode: str = arg("-m", default="x", choices=["x", "fast"])
+            sub: ClassVar = subparser()
+            count: int = arg("-c", default=1, subparser=sub)
+
+        with pytest.raises(ParseError) as info:
+            parse(Invalid, [], raise_errors=True)
+        assert message in str(info.value)
+        with pytest.raises(SystemExit):
+            parse(Invalid, [])
+        assert message in capsys.readouterr().err
+
+    with pytest.raises(ValueError):
+        dataparser(config_files=["config.yaml"])
+
+    import asyncio
+
+    async def upper(text: str) -> str:
+        return text.upper()
+
+    (tmp_path / "users.json").write_text('{"users": ["ann", "bob"], "owner": "eve"}')
+
+    @dataparser(prog="sim", config_files=[tmp_path / "users.json"])
+    class Users:
+        users: list[str] = arg("-u", nargs="*", type=upper, default=None)
+        owner: str = arg("-o", type=upper, default="")
+
+    for _ in range(2):  # the values are converted (and awaited) on each parse
+        assert asyncio.run(parse_async(Users, [])) == Users(["ANN", "BOB"], "EVE")
+
+
+def test_38_environment_variables(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    (tmp_path / "app.json").write_text('{"host": "config", "port": 80}')
+
+    @dataparser(prog="app", env_prefix="APP_", config_files=[tmp_path / "app.json"])
+    class App:
+        host: str = arg("-H", default="localhost")
+        port: int = arg("-p", default=8000)
+        debug: bool = arg("-d", default=False)
+        tags: list[str] = arg("-t", nargs="*", default=None)
+        token: str = arg("-k", default="", env="SECRET_TOKEN")
+
+    monkeypatch.delenv("SECRET_TOKEN", raising=False)
+    names = ["APP_HOST", "APP_PORT", "APP_DEBUG", "APP_TAGS", "SECRET_TOKEN"]
+    assert [spec.env for spec in make_plan(App).arguments] == names
+    assert parse(App, []) == App("config", 80, False, None, "")
+
+    monkeypatch.setenv("APP_PORT", "9000")
+    monkeypatch.setenv("APP_DEBUG", "yes")
+    monkeypatch.setenv("APP_TAGS", "a 'b c'")
+    monkeypatch.setenv("APP_HOST", "")
+    monkeypatch.setenv("SECRET_TOKEN", "xyz")
+    for backend in ["argparse", "table"]:
+        assert parse(App, [], backend=backend) == App("config", 9000, True, ["a", "b c"], "xyz")
+        assert parse(App, "-p 1 -t", backend=backend) == App("config", 1, True, [], "xyz")
+    assert parse_known(App, "-H h --other") == (App("h", 9000, True, ["a", "b c"], "xyz"), ["--other"])
+
+    @dataparser(prog="app", env_prefix="APP_", frozen=True)
+    class Simple:  # parsed by the generated function of `parse()`
+        port: int = arg("-p", default=8000)
+        debug: bool = arg("-d", default=False)
+        host: str = default("localhost")
+
+    assert parse(Simple, []) == Simple(9000, True)
+    assert parse(Simple, ["-p", "1"]) == Simple(1, True)
+
+    monkeypatch.setenv("APP_PORT", "x")
+    with pytest.raises(ParseError) as info:
+        parse(App, [], raise_errors=True)
+    assert "invalid int value: 'x' (in environment variable APP_PORT)" in str(info.value)
+
+    @dataparser(prog="app", env_prefix="APP_")
+    class Positional:  # the positionals are not read from environment variables
+        name: str
+        port: int = arg("-p", default=8000)
+
+    assert [spec.env for spec in make_plan(Positional).arguments] == [None, "APP_PORT"]
+    monkeypatch.setenv("APP_PORT", "9000")
+    assert parse(Positional, ["x"]) == Positional("x", 9000)
+
+    @dataparser
+    class InvalidPositional:
+        name: str = arg(env="NAME")
+
+    with pytest.raises(ValueError):
+        make_plan(InvalidPositional)
+    with pytest.raises(ValueError):
+        arg(env="NAME", subparser=group())
+
+    import asyncio
+    import warnings
+
+    async def upper(text: str) -> str:
+        return text.upper()
+
+    @dataparser(prog="app", env_prefix="APP_")
+    class Users:
+        users: list[str] = arg("-u", nargs="*", type=upper, default=None)
+
+    monkeypatch.setenv("APP_USERS", "ann bob")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # no coroutine is left unawaited
+        for _ in range(2):
+            assert asyncio.run(parse_async(Users, [])) == Users(["ANN", "BOB"])
+        gc.collect()
+
+
+def test_39_completion_scripts(tmp_path):
+    @dataparser(prog="app")
+    class App:
+        mode: str = arg("-m", default="fast", choices=["fast", "slow"], help="the mode")
+        output: Path = arg("-o", default=None)
+        secret: str = arg("--secret", default="", help=SUPPRESS)
+        command: str = subparsers()
+        run: ClassVar = subparser(help="run a job", aliases=["r"])
+        build: ClassVar = subparser()
+        target: str = arg("-t", default=None, choices=["x86", "arm"], subparser=run)
+        inputs: list[Path] = arg("-i", nargs="+", default=None, subparser=build)
+        level: int = arg("-l", default=0, choices=[1, 2, 3], subparser=build)
+
+    scripts = {shell: completion_script(App, shell) for shell in ["bash", "zsh", "fish"]}
+    assert "complete -F _dataparsers_app app" in scripts["bash"]
+    assert scripts["zsh"].startswith("#compdef app\n")
+    assert "'run'\\t'run a job'" in scripts["fish"] and "--secret'\\t" not in scripts["fish"]
+    assert "complete -c 'my-app' -f -a '(_dataparsers_my_app)'" in completion_script(App, "fish", prog="my-app")
+    with pytest.raises(ValueError):
+        completion_script(App, "powershell")
+
+    if shutil.which("bash") is None:
+        return
+    (tmp_path / "app.bash").write_text(scripts["bash"])
+    (tmp_path / "out.txt").write_text("")
+    cases = {
+        "app ''": "run r build",
+        "app --": "--help --mode --output",
+        "app -m ''": "fast slow",
+        "app --mode = s": "slow",
+        "app --secret x -m fast r": "run r",
+        "app r -t ''": "x86 arm",
+        "app build -i out.txt -": "-h --help -i --inputs -l --level",
+        "app build -i out.txt --level=2 -l ''": "1 2 3",
+        "app -o ou": "out.txt",
+    }
+    for words, expected in cases.items():
+        script = f"source app.bash; COMP_WORDS=({words}); COMP_CWORD=$((${{#COMP_WORDS[@]}} - 1)); _dataparsers_app"
+        result = subprocess.run(["bash", "-c", script + '; echo "${COMPREPLY[*]}"'], cwd=tmp_path, capture_output=True)
+        assert result.stdout.decode().strip() == expected, words
+
+
+def test_40_runtime_completion(tmp_path, monkeypatch, capsys: CapSys):
+    (tmp_path / "completed_command.py").write_text(
+        "from pathlib import Path\n"
+        "from dataparsers import arg, dataparser\n"
+        "@dataparser\n"
+        "class TrainArgs:\n"
+        "    data: Path\n"
+        "    device: str = arg('-d', default='cpu', choices=['cpu', 'gpu'])\n"
+    )
+    (tmp_path / "data.csv").write_text("")
+    (tmp_path / "dataset").mkdir()
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "completed_command", raising=False)
+    monkeypatch.chdir(tmp_path)
+
+    @dataparser(prog="app")
+    class App:
+        command: Any = subparsers()
+        mode: str = arg("-m", default="fast", choices=["fast", "slow"])
+        train: ClassVar = subparser(dataclass="completed_command:TrainArgs", aliases=["t"])
+        test: ClassVar = subparser()
+        level: int = arg("-l", default=0, choices=[1, 2], subparser=test)
+
+    assert completions(App, "app ") == ["train", "t", "test"]
+    assert completions(App, "app -") == ["-h", "--help", "-m", "--mode"]
+    assert completions(App, "app --mode=s") == ["--mode=slow"]
+    assert completions(App, "app -m fast test --level ") == ["1", "2"]
+    assert completions(App, "app test -m", point=8) == ["test"]
+    assert "completed_command" not in sys.modules
+
+    assert completions(App, "app t -d ") == ["cpu", "gpu"]
+    assert completions(App, "app train da") == ["data.csv", f"dataset{os.sep}"]
+    assert completions(App, "app train 'data") == ["data.csv", f"dataset{os.sep}"]
+    assert completions(App, "app train -d gpu data.csv ") == []
+
+    autocomplete(App)  # no completion request
+    monkeypatch.setenv("COMP_LINE", "app --mode=s")
+    monkeypatch.setenv("COMP_POINT", "12")
+    monkeypatch.setenv("COMP_TYPE", "9")
+    monkeypatch.setattr(sys, "argv", ["app", "app", "s", "--mode"])
+    with pytest.raises(SystemExit):
+        autocomplete(App)
+    assert capsys.readouterr().out == "slow\n"